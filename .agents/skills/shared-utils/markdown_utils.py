@@ -1,4 +1,5 @@
 import re
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
 
 def generate_github_anchor(title: str) -> str:
     """
@@ -17,3 +18,119 @@ def generate_github_anchor(title: str) -> str:
     # 4. 去除两端的连字符
     anchor = anchor.strip('-')
     return anchor
+
+
+# --- 单次扫描的 Markdown 结构 ---
+
+# 标题最多缩进 3 个空格；'#' 后必须有空白和非空标题
+_HEADING = re.compile(r'(#{1,6})[ \t]+(.+)$')
+# [文本](目标)；目标以 '#' 开头即为页内锚点链接
+_LINK = re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)')
+
+
+class Heading(NamedTuple):
+    level: int
+    title: str
+    anchor: str      # 与 GitHub 一致：重复标题依次追加 -1、-2 ...
+    line: int        # 从 1 开始的行号
+
+
+class FencedBlock(NamedTuple):
+    info: str        # 开始标记后的信息串（如 'bash'、'text'）
+    start: int       # 开始标记所在行
+    end: int         # 结束标记所在行（未闭合时为最后一行）
+    body: List[str]
+
+
+class Link(NamedTuple):
+    text: str
+    target: str
+    line: int
+
+
+class MarkdownDocument:
+    """
+    scan_markdown() 的结果：一次逐行扫描得到的标题、代码块与链接（均带行号）。
+    代码块内的 '#' 行和链接不计入，各项检查只需消费这些结构，无需再次扫描全文。
+    """
+
+    def __init__(self, lines: List[str], headings: List[Heading],
+                 blocks: List[FencedBlock], links: List[Link]):
+        self.lines = lines
+        self.headings = headings
+        self.blocks = blocks
+        self.links = links
+
+    def anchors(self) -> Set[str]:
+        return {h.anchor for h in self.headings}
+
+    def anchor_links(self, start: int = 1, end: Optional[int] = None) -> List[Link]:
+        """行号 [start, end] 范围内指向页内锚点的链接"""
+        end = len(self.lines) if end is None else end
+        return [l for l in self.links if l.target.startswith('#') and start <= l.line <= end]
+
+    def section(self, title: str) -> Optional[Tuple[int, int]]:
+        """标题为 title 的章节行号范围（到下一个同级或更高级标题之前），不存在时返回 None"""
+        for index, heading in enumerate(self.headings):
+            if heading.title != title:
+                continue
+            end = len(self.lines)
+            for following in self.headings[index + 1:]:
+                if following.level <= heading.level:
+                    end = following.line - 1
+                    break
+            return heading.line, end
+        return None
+
+
+def scan_markdown(content: str) -> MarkdownDocument:
+    """
+    单次线性扫描 Markdown：识别 ``` / ~~~ 围栏代码块（闭合标记须为同一字符且不短于开始标记），
+    围栏外收集 ATX 标题（生成锚点）与 [文本](目标) 链接。
+    """
+    lines = content.split('\n')
+    headings: List[Heading] = []
+    blocks: List[FencedBlock] = []
+    links: List[Link] = []
+    anchor_counts: Dict[str, int] = {}
+    fence = None  # (标记字符, 标记长度, 信息串, 开始行, 代码行)
+
+    for number, line in enumerate(lines, 1):
+        stripped = line.lstrip(' ')
+        indented = len(line) - len(stripped) > 3
+        if fence is not None:
+            char, length, info, start, body = fence
+            closing = stripped.rstrip()
+            if not indented and len(closing) >= length and closing == char * len(closing):
+                blocks.append(FencedBlock(info, start, number, body))
+                fence = None
+            else:
+                body.append(line)
+            continue
+        if indented:
+            continue
+        first = stripped[:1]
+        if first in ('`', '~') and stripped.startswith(first * 3):
+            length = len(stripped) - len(stripped.lstrip(first))
+            info = stripped[length:].strip()
+            # 反引号围栏的信息串不能含反引号（否则是行内代码），按普通行处理
+            if first == '~' or '`' not in info:
+                fence = (first, length, info, number, [])
+                continue
+        if first == '#':
+            match = _HEADING.match(stripped)
+            if match:
+                title = match.group(2).strip()
+                anchor = generate_github_anchor(title)
+                seen = anchor_counts.get(anchor, 0)
+                anchor_counts[anchor] = seen + 1
+                headings.append(Heading(len(match.group(1)), title,
+                                        f"{anchor}-{seen}" if seen else anchor, number))
+        if '](' in line:
+            links.extend(Link(m.group(1), m.group(2), number) for m in _LINK.finditer(line))
+
+    if fence is not None:
+        # 未闭合的围栏一直延续到文末
+        char, length, info, start, body = fence
+        blocks.append(FencedBlock(info, start, len(lines), body))
+    return MarkdownDocument(lines, headings, blocks, links)
@@ -10,12 +10,16 @@
 """
 
 import os
+import argparse
 import json
 import datetime
+import fnmatch
 import re
 import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
 
 # --- 引入共享配置 ---
 # auto_status.py 通常在 context/ 目录下，需要向上一级导入
@@ -24,8 +28,24 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 try:
-    from scripts.config import IGNORE_DIRS, EXTENSIONS, PROJECT_ROOT
+    from scripts.config import IGNORE_DIRS, EXTENSIONS, PROJECT_ROOT, CACHE_DIR, LARGE_FILE_BYTES, LARGE_FILE_POLICY
+    from scripts.linecount import SKIPPED
+    from scripts.pathfilter import PathFilter
+    from scripts.tree_cache import TreeCache
+    from scripts.status_manifest import StatusManifest
+    from scripts.fs_watcher import create_watcher
+    from scripts.utils import atomic_write_text
+    from scripts.lockfiles import LockfileCache
+    from scripts.status_snapshot import diff_snapshots, load_snapshot, render_diff, save_snapshot, take_snapshot
 except ImportError:
+    LockfileCache = None
+    take_snapshot = None
+    LARGE_FILE_BYTES, LARGE_FILE_POLICY, SKIPPED = None, 'count', -1
+    TreeCache = None
+    PathFilter = None
+    StatusManifest = None
+    create_watcher = None
+    atomic_write_text = None
     # Fallback
     IGNORE_DIRS = {'.git', '__pycache__', 'node_modules', 'context', '.gemini', '.history'}
     EXTENSIONS = {'.py', '.md', '.json', '.js', '.vue', '.ps1', '.sh', '.txt'}
@@ -36,6 +56,16 @@ except ImportError:
 WARNINGS = []
 
 
+class ProjectStats(NamedTuple):
+    """单次项目分析结果"""
+    file_count: int
+    line_count: int
+    structure: str
+    manifests: List[str]
+    # (相对路径, 字节数, 行数, 误差)；误差 0 为精确计数，>0 为抽样估计，SKIPPED 为跳过
+    large_files: Sequence[Tuple[str, int, int, int]] = ()
+
+
 def add_warning(msg: str):
     """记录运行中的警告"""
     WARNINGS.append(msg)
@@ -56,23 +86,61 @@ DEPENDENCY_FILES = {
     '*.csproj': 'C# (.NET)',
 }
 
+# 锁文件映射（完整解析依赖及版本，流式读取）
+LOCK_FILES = {
+    'package-lock.json': 'Node.js',
+    'poetry.lock': 'Python (Poetry)',
+    'Cargo.lock': 'Rust',
+    'go.sum': 'Go',
+}
+
+# 完整依赖清单输出（status.md 中只写摘要）
+DEPENDENCY_REPORT = 'context/dependencies.json'
+
+# Monorepo 模式：每个子项目的状态文件目录
+PACKAGES_DIR = 'context/packages'
+
+# --diff 输出：与上一次运行快照相比的变化报告
+STATUS_DIFF = 'context/status_diff.md'
+
+
+# 预编译清单匹配：精确文件名走字典查找，通配符合并为正则，每个文件名只匹配一次
+_EXACT_MANIFESTS = {name: tech for name, tech in DEPENDENCY_FILES.items() if '*' not in name}
+_WILDCARD_MANIFESTS = [(re.compile(fnmatch.translate(pattern)), tech)
+                       for pattern, tech in DEPENDENCY_FILES.items() if '*' in pattern]
+
 
-def detect_tech_stack(root_path: str = '.') -> Dict[str, List[str]]:
-    """检测项目技术栈"""
+def match_manifest(filename: str) -> Optional[str]:
+    """返回依赖清单文件对应的技术栈名称（非清单文件返回 None）"""
+    tech = _EXACT_MANIFESTS.get(filename)
+    if tech is None:
+        for regex, wildcard_tech in _WILDCARD_MANIFESTS:
+            if regex.match(filename):
+                return wildcard_tech
+    return tech
+
+
+def detect_tech_stack(root_path: str = '.', manifests: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    检测项目技术栈。
+    manifests: 项目遍历时顺带收集的清单文件相对路径（含嵌套子项目）；
+               未提供时仅检查根目录，不做二次全量遍历。
+    """
+    if manifests is None:
+        manifests = [name for name in sorted(os.listdir(root_path))
+                     if match_manifest(name) and os.path.isfile(os.path.join(root_path, name))]
+
+    found = {}
+    for rel_path in sorted(manifests, key=lambda p: (p.count('/'), p)):
+        tech = match_manifest(os.path.basename(rel_path))
+        if tech:
+            found.setdefault(tech, []).append(os.path.join(root_path, rel_path))
+
+    # 保持 DEPENDENCY_FILES 的声明顺序；每项中根目录清单排在最前
     detected = {}
-    
-    for dep_file, tech_name in DEPENDENCY_FILES.items():
-        if '*' in dep_file:
-            # 处理通配符（如 *.csproj）
-            pattern = dep_file.replace('*', '')
-            for file in Path(root_path).rglob(f'*{pattern}'):
-                if file.is_file():
-                    detected[tech_name] = detected.get(tech_name, []) + [str(file)]
-        else:
-            file_path = Path(root_path) / dep_file
-            if file_path.exists():
-                detected[tech_name] = [str(file_path)]
-    
+    for tech in DEPENDENCY_FILES.values():
+        if tech in found and tech not in detected:
+            detected[tech] = found[tech]
     return detected
 
 
@@ -101,6 +169,8 @@ def extract_dependencies(tech_stack: Dict[str, List[str]]) -> Dict[str, List[str
                         deps = lines[:5]
                 except Exception as e:
                     add_warning(f"读取 requirements.txt ({file_path}) 时出错: {e}")
+            if deps:
+                break  # 以最靠近根目录的清单为准（嵌套子项目排在后面）
         
         if deps:
             dependencies[tech] = deps
@@ -108,11 +178,143 @@ def extract_dependencies(tech_stack: Dict[str, List[str]]) -> Dict[str, List[str
     return dependencies
 
 
-def get_project_analysis(root_path: str = '.', max_depth: int = 2) -> Tuple[int, int, str]:
-    """单次遍历项目，获取文件数、行数和目录结构"""
+def resolve_lockfiles(root_path: str, manifests: Optional[List[str]]) -> Dict[str, List[Tuple[str, str]]]:
+    """解析遍历时收集到的锁文件：{相对路径: [(name, version), ...]}（按内容哈希缓存）"""
+    if LockfileCache is None or not manifests:
+        return {}
+    cache = LockfileCache()
+    resolved = {}
+    for rel_path in manifests:
+        if os.path.basename(rel_path) not in LOCK_FILES:
+            continue
+        try:
+            resolved[rel_path] = cache.dependencies(os.path.join(root_path, rel_path))
+        except Exception as e:
+            add_warning(f"解析锁文件 {rel_path} 时出错: {e}")
+    cache.save()
+    return resolved
+
+
+def write_dependency_report(lock_deps: Dict[str, List[Tuple[str, str]]], output_file: str = DEPENDENCY_REPORT):
+    """写出完整依赖清单 (JSON)；没有锁文件时不生成"""
+    if not lock_deps:
+        return
+    report = {}
+    for rel_path, deps in lock_deps.items():
+        packages: Dict[str, List[str]] = {}
+        for name, version in deps:
+            packages.setdefault(name, []).append(version)
+        report[rel_path] = {
+            'tech': LOCK_FILES[os.path.basename(rel_path)],
+            'count': len(deps),
+            'packages': packages,
+        }
+    content = json.dumps(report, ensure_ascii=False, separators=(',', ':')) + '\n'
+    try:
+        if atomic_write_text is not None:
+            atomic_write_text(output_file, content)
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+    except Exception as e:
+        add_warning(f"写入依赖清单 {output_file} 失败: {e}")
+
+
+def count_file_lines(file_path: str) -> int:
+    """统计单个文件的非空行数（无缓存回退路径使用）"""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _report_count_error(file_path: str, error: Exception):
+    if isinstance(error, (PermissionError, OSError)):
+        add_warning(f"无法读取文件 {file_path}: {error}")
+    else:
+        add_warning(f"统计文件 {file_path} 行数时出错: {error}")
+
+
+def _render_structure(entries: List[Tuple[int, str, List[str]]], max_depth: int) -> str:
+    """由 (level, basename, matched_files) 条目生成限深目录结构"""
+    structure = []
+    for level, basename, matched_files in entries:
+        if level >= max_depth:
+            continue
+        indent = '  ' * level
+        structure.append(f"{indent}- {basename if level else 'ROOT'}/")
+        for file in matched_files[:5]:
+            structure.append(f"{indent}  - {file}")
+        if len(matched_files) > 5:
+            structure.append(f"{indent}  - ... ({len(matched_files)-5} more files)")
+    return '\n'.join(structure)
+
+
+class ProjectAnalyzer:
+    """
+    持有 TreeCache 与文件清单 (manifest) 的增量分析器，单次运行与 --watch 模式共用。
+    目录列表按目录 mtime 校验，行数只重新读取 stat 签名 (size, mtime, inode) 变化的文件。
+    inherit_from: 上层目录（如仓库根目录），其与 root_path 之间各级 .gitignore 规则同样生效。
+    """
+
+    def __init__(self, root_path: str = '.', max_depth: int = 2, workers: Optional[int] = None,
+                 inherit_from: Optional[str] = None):
+        self.root_path = root_path
+        self.max_depth = max_depth
+        self.workers = workers
+        path_filter = PathFilter(root_path, inherit_from=inherit_from) if inherit_from else None
+        self.tree = TreeCache(root_path, manifest_patterns=list(DEPENDENCY_FILES) + list(LOCK_FILES),
+                              path_filter=path_filter)
+        self.manifest = StatusManifest(root_path)
+
+    def analyze(self, changed_paths: Optional[Set[str]] = None) -> ProjectStats:
+        """
+        changed_paths: 文件监听器报告的绝对路径；提供时只重新列出/统计受影响的目录和文件，
+                       None 表示全部按 stat 校验。
+        """
+        dirty, changed_files = self._split_changes(changed_paths)
+        # 一次遍历同时刷新文件 stat 签名，清单不再逐个 stat()
+        entries = self.tree.scan(dirty=dirty, restat=True)
+        self.manifest.update(self.tree.files(), on_error=_report_count_error, workers=self.workers,
+                             changed=changed_files, stats=self.tree.stats())
+        self.manifest.save()
+
+        file_count, line_count = self.manifest.totals()
+        return ProjectStats(file_count, line_count, _render_structure(entries, self.max_depth),
+                            self.tree.manifests(), self.manifest.large_files())
+
+    def _split_changes(self, changed_paths: Optional[Set[str]]):
+        """绝对路径 -> (需重新列出的相对目录, 需重新 stat 的相对文件)"""
+        root = os.path.abspath(self.root_path)
+        if changed_paths is None or root in changed_paths:
+            return None, None  # 队列溢出或根目录事件：全量校验
+        dirty, files = set(), set()
+        for path in changed_paths:
+            rel = os.path.relpath(path, root)
+            if rel.startswith('..'):
+                continue
+            rel = rel.replace(os.sep, '/')
+            files.add(rel)
+            parent = os.path.dirname(rel)
+            dirty.update((rel, parent))
+        return dirty, files
+
+
+def get_project_analysis(root_path: str = '.', max_depth: int = 2) -> ProjectStats:
+    """
+    单次遍历获取文件数、行数、目录结构和依赖清单文件（相对路径，含嵌套子项目）。
+    增量模式见 ProjectAnalyzer；缺少 scripts 包时回退为完整遍历。
+    """
+    if TreeCache is None or StatusManifest is None:
+        return _walk_project_analysis(root_path, max_depth)
+    return ProjectAnalyzer(root_path, max_depth).analyze()
+
+
+def _walk_project_analysis(root_path: str = '.', max_depth: int = 2) -> ProjectStats:
+    """单次遍历项目（无缓存回退路径）"""
     file_count = 0
     line_count = 0
-    structure = []
+    entries = []
+    manifests = []
+    suffixes = tuple(EXTENSIONS)  # 一次 C 层 endswith() 判断扩展名
     
     for root, dirs, files in os.walk(root_path):
         # 计算当前深度
@@ -122,29 +324,54 @@ def get_project_analysis(root_path: str = '.', max_depth: int = 2) -> Tuple[int,
         # 过滤忽略目录
         dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
         
-        # 1. 统计文件和行数
-        matched_files = [f for f in files if any(f.endswith(ext) for ext in EXTENSIONS)]
+        rel_prefix = '' if rel_root == '.' else rel_root.replace(os.sep, '/') + '/'
+        manifests.extend(rel_prefix + f for f in files if match_manifest(f) or f in LOCK_FILES)
+
+        matched_files = [f for f in files if f.endswith(suffixes)]
         for file in matched_files:
             file_count += 1
             file_path = os.path.join(root, file)
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    line_count += sum(1 for line in f if line.strip())
-            except (PermissionError, OSError) as e:
-                add_warning(f"无法读取文件 {file_path}: {e}")
+                line_count += count_file_lines(file_path)
             except Exception as e:
-                add_warning(f"统计文件 {file_path} 行数时出错: {e}")
-
-        # 2. 生成目录结构（限制深度）
-        if level < max_depth:
-            indent = '  ' * level
-            structure.append(f"{indent}- {os.path.basename(root) if rel_root != '.' else 'ROOT'}/")
-            for file in matched_files[:5]:
-                structure.append(f"{indent}  - {file}")
-            if len(matched_files) > 5:
-                structure.append(f"{indent}  - ... ({len(matched_files)-5} more files)")
+                _report_count_error(file_path, e)
+        entries.append((level, os.path.basename(root), matched_files))
     
-    return file_count, line_count, '\n'.join(structure)
+    return ProjectStats(file_count, line_count, _render_structure(entries, max_depth), manifests)
+
+
+def _format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def render_large_files(large_files: Sequence[Tuple[str, int, int, int]]) -> Tuple[str, str]:
+    """
+    Large-file report: (scale_note, markdown_section).
+    scale_note qualifies the line total when it contains estimates or skipped files.
+    """
+    if not large_files:
+        return "", ""
+    lines = [f"### Large Files (≥ {_format_size(LARGE_FILE_BYTES or 0)}, policy: {LARGE_FILE_POLICY})"]
+    sampled_error, skipped = 0, 0
+    for path, size, count, error in large_files:
+        if error == SKIPPED:
+            skipped += 1
+            lines.append(f"- `{path}` ({_format_size(size)}): skipped, not counted")
+        elif error:
+            sampled_error += error
+            lines.append(f"- `{path}` ({_format_size(size)}): ~{count:,} ± {error:,} lines (sampled)")
+        else:
+            lines.append(f"- `{path}` ({_format_size(size)}): {count:,} lines")
+    notes = []
+    if sampled_error:
+        notes.append(f"± {sampled_error:,} from sampled large files")
+    if skipped:
+        notes.append(f"{skipped} large file(s) skipped")
+    scale_note = f" ({'; '.join(notes)})" if notes else ""
+    return scale_note, '\n'.join(lines) + '\n\n'
 
 
 def read_manual_section(status_file: str) -> str:
@@ -179,14 +406,34 @@ _可选：记录即将进行的开发任务_"""
     return default_manual
 
 
-def generate_status_md(root_path: str, file_count: int, line_count: int, dir_structure: str) -> str:
-    """Generate status.md content (AI-friendly English format)"""
-    # 1. Detect tech stack
-    tech_stack = detect_tech_stack(root_path)
+def generate_status_md(root_path: str, file_count: int, line_count: int, dir_structure: str,
+                       manifests: Optional[List[str]] = None,
+                       lock_deps: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+                       status_file: Optional[str] = None,
+                       title: str = "Project Status Snapshot (AI-Centric)",
+                       extra_md: str = "",
+                       refresh_command: str = "python context/auto_status.py",
+                       large_files: Sequence[Tuple[str, int, int, int]] = ()) -> str:
+    """
+    Generate status.md content (AI-friendly English format)
+    status_file: existing file whose manual section is preserved (default: <root>/context/status.md)
+    extra_md: additional auto-generated Markdown (e.g. the monorepo package roll-up)
+    """
+    # 1. Detect tech stack (from manifests collected during the project walk)
+    tech_stack = detect_tech_stack(root_path, manifests)
     dependencies = extract_dependencies(tech_stack)
+    if lock_deps is None:
+        lock_deps = resolve_lockfiles(root_path, manifests)
+
+    # Resolved versions from the root-most lockfile of each tech (manifests are shallowest first)
+    resolved_versions: Dict[str, Dict[str, str]] = {}
+    for rel_path, deps in lock_deps.items():
+        versions = resolved_versions.setdefault(LOCK_FILES[os.path.basename(rel_path)], {})
+        for name, version in deps:
+            versions.setdefault(name, version)
     
     # 2. Read manual section
-    manual_section = read_manual_section(os.path.join(root_path, 'context', 'status.md'))
+    manual_section = read_manual_section(status_file or os.path.join(root_path, 'context', 'status.md'))
     
     # 3. Current timestamp
     current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -197,13 +444,25 @@ def generate_status_md(root_path: str, file_count: int, line_count: int, dir_str
         for tech, files in tech_stack.items():
             tech_stack_md += f"- **{tech}**"
             if tech in dependencies and dependencies[tech]:
-                deps_str = ', '.join(dependencies[tech])
+                versions = resolved_versions.get(tech, {})
+                deps_str = ', '.join(f"{dep}@{versions[dep]}" if dep in versions else dep
+                                     for dep in dependencies[tech])
                 tech_stack_md += f" (Main Deps: {deps_str})"
             tech_stack_md += f"\n  - Detected from: `{os.path.basename(files[0])}`\n"
     else:
         tech_stack_md = "_No standard dependency files detected_"
+
+    if lock_deps:
+        tech_stack_md += "\n### Resolved Dependencies\n"
+        for rel_path, deps in lock_deps.items():
+            names = len({name for name, _ in deps})
+            tech_stack_md += (f"- `{rel_path}` ({LOCK_FILES[os.path.basename(rel_path)]}): "
+                              f"{len(deps):,} packages ({names:,} unique names)\n")
+        tech_stack_md += f"\n_Full resolved list: `{DEPENDENCY_REPORT}`_"
+
+    scale_note, large_files_md = render_large_files(large_files)
     
-    content = f"""# Project Status Snapshot (AI-Centric)
+    content = f"""# {title}
 
 > **NOTE**: This file is automatically maintained by `context/auto_status.py`.
 > DO NOT manually edit the "Auto-Generated" section.
@@ -213,12 +472,12 @@ def generate_status_md(root_path: str, file_count: int, line_count: int, dir_str
 ## 📊 Auto-Generated Section
 
 **Last Updated**: {current_time}  
-**Project Scale**: {file_count} files, {line_count:,} lines of code
+**Project Scale**: {file_count} files, {line_count:,} lines of code{scale_note}
 
 ### Technology Stack
 {tech_stack_md}
 
-### Project Structure (Max Depth: 2)
+{extra_md}{large_files_md}### Project Structure (Max Depth: 2)
 ```
 {dir_structure}
 ```
@@ -236,36 +495,169 @@ def generate_status_md(root_path: str, file_count: int, line_count: int, dir_str
 Run the following command to refresh this file:
 
 ```bash
-python context/auto_status.py
+{refresh_command}
 ```
 """
     return content
 
 
-def main():
-    """主函数"""
-    print("🔄 正在分析项目状态...")
-    
-    # 切换到项目根目录 (统一使用 PROJECT_ROOT)
-    os.chdir(PROJECT_ROOT)
-    
-    # 单次遍历完成所有统计
-    file_count, line_count, dir_structure = get_project_analysis('.')
-    
-    # 生成内容
-    content = generate_status_md('.', file_count, line_count, dir_structure)
-    
-    # 写入文件
-    output_file = 'context/status.md'
+def build_status(root_path: str, stats: ProjectStats,
+                 lock_deps: Optional[Dict[str, List[Tuple[str, str]]]] = None) -> str:
+    """解析锁文件（未传入时）、写出完整依赖清单，并生成 status.md 内容"""
+    if lock_deps is None:
+        lock_deps = resolve_lockfiles(root_path, stats.manifests)
+    write_dependency_report(lock_deps, os.path.join(root_path, DEPENDENCY_REPORT))
+    return generate_status_md(root_path, stats.file_count, stats.line_count, stats.structure,
+                              stats.manifests, lock_deps, large_files=stats.large_files)
+
+
+def find_package_roots(manifests: List[str]) -> List[str]:
+    """子项目根目录：任何包含 DEPENDENCY_FILES 清单的非根目录（按路径排序）"""
+    return sorted({os.path.dirname(m) for m in manifests if match_manifest(os.path.basename(m))} - {''})
+
+
+def _package_owner(rel_path: str, packages: Set[str]) -> Optional[str]:
+    """文件所属的最深层子项目（不属于任何子项目时返回 None）"""
+    parent = os.path.dirname(rel_path)
+    while parent:
+        if parent in packages:
+            return parent
+        parent = os.path.dirname(parent)
+    return None
+
+
+def _package_slug(package: str) -> str:
+    return package.replace('/', '__')
+
+
+def _analyze_package(package: str) -> Tuple[str, tuple, List[str]]:
+    """进程池任务：分析单个子项目（独立的 TreeCache 与文件清单，互不影响缓存有效性）"""
+    start = len(WARNINGS)
+    # 子项目本身已是并行单位，行数统计不再嵌套进程池；根目录及上层 .gitignore 规则同样适用
+    stats = ProjectAnalyzer(package, workers=1, inherit_from='.').analyze()
+    # 以普通元组跨进程返回：按文件路径加载本模块时 ProjectStats 无法被 pickle 定位
+    return package, tuple(stats), WARNINGS[start:]
+
+
+def run_monorepo(workers: Optional[int] = None, report_diff: bool = False) -> Optional[Tuple[int, int]]:
+    """
+    Monorepo 模式：并行分析各子项目，写出 context/packages/<包>.md 与根目录汇总 status.md。
+    返回 (文件数, 行数)；未发现子项目时返回 None。
+    """
+    root = ProjectAnalyzer('.')
+    entries = root.tree.scan()
+    manifests = root.tree.manifests()
+    packages = find_package_roots(manifests)
+    if not packages:
+        return None
+    print(f"📦 发现 {len(packages)} 个子项目")
+
+    # 1. 各子项目并行分析（每个进程一个子项目）
+    results: Dict[str, ProjectStats] = {}
+    workers = min(workers or os.cpu_count() or 1, len(packages))
+    if workers <= 1:
+        for package, stats, _ in map(_analyze_package, packages):
+            results[package] = ProjectStats(*stats)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for package, stats, warnings in pool.map(_analyze_package, packages):
+                results[package] = ProjectStats(*stats)
+                WARNINGS.extend(warnings)
+
+    # 2. 不属于任何子项目的文件单独统计（独立清单，不影响普通模式的缓存）
+    package_set = set(packages)
+    outside = [p for p in root.tree.files() if _package_owner(p, package_set) is None]
+    root_manifest = StatusManifest('.', manifest_file=CACHE_DIR / 'status_manifest-monorepo-root.json')
+    root_manifest.update(outside, on_error=_report_count_error)
+    root_manifest.save()
+    file_count, line_count = root_manifest.totals()
+    large_files = list(root_manifest.large_files())
+    # 嵌套子项目已包含在上层子项目的统计中，只累加顶层子项目
+    for package in packages:
+        if _package_owner(package, package_set) is None:
+            file_count += results[package].file_count
+            line_count += results[package].line_count
+            large_files.extend((f"{package}/{path}", *rest) for path, *rest in results[package].large_files)
+    large_files.sort(key=lambda item: (-item[1], item[0]))
+
+    # 3. 锁文件只在主进程解析一次（按内容哈希缓存），再按子项目分发
+    lock_deps = resolve_lockfiles('.', manifests)
+    write_dependency_report(lock_deps)
+
+    # 4. 写出各子项目状态文件，清理已不存在的子项目
+    os.makedirs(PACKAGES_DIR, exist_ok=True)
+    rows = []
+    for package in packages:
+        pkg_files, pkg_lines, pkg_structure, pkg_manifests, pkg_large = results[package]
+        prefix = package + '/'
+        pkg_locks = {rel[len(prefix):]: deps for rel, deps in lock_deps.items() if rel.startswith(prefix)}
+        output_file = os.path.join(PACKAGES_DIR, f"{_package_slug(package)}.md")
+        write_status(generate_status_md(
+            package, pkg_files, pkg_lines, pkg_structure, pkg_manifests, pkg_locks,
+            status_file=output_file, title=f"Package Status Snapshot: `{package}`",
+            refresh_command="python context/auto_status.py --monorepo", large_files=pkg_large), output_file)
+        stack = sorted({match_manifest(m) for m in pkg_manifests if '/' not in m} - {None})
+        rows.append(f"| `{package}` | {', '.join(stack)} | {pkg_files} | {pkg_lines:,} | "
+                    f"`{output_file}` |")
+    expected = {f"{_package_slug(p)}.md" for p in packages}
+    for name in os.listdir(PACKAGES_DIR):
+        if name.endswith('.md') and name not in expected:
+            os.remove(os.path.join(PACKAGES_DIR, name))
+
+    # 5. 根目录汇总
+    packages_md = ("### Packages (Monorepo)\n"
+                   "| Package | Stack | Files | Lines | Status |\n"
+                   "|---|---|---|---|---|\n" + '\n'.join(rows) + "\n\n")
+    write_status(generate_status_md(
+        '.', file_count, line_count, _render_structure(entries, 2), manifests, lock_deps,
+        extra_md=packages_md, refresh_command="python context/auto_status.py --monorepo",
+        large_files=large_files))
+
+    # 6. 快照：合并根目录清单与顶层子项目已保存的清单
+    files = root_manifest.line_counts()
+    for package in packages:
+        if _package_owner(package, package_set) is None:
+            files.update((f"{package}/{path}", lines)
+                         for path, lines in StatusManifest(package).line_counts().items())
+    record_snapshot(files, lock_deps, report_diff)
+    return file_count, line_count
+
+
+def record_snapshot(files: Dict[str, int], lock_deps: Dict[str, List[Tuple[str, str]]],
+                    report_diff: bool = False):
+    """
+    保存本次运行快照（行数直接取自文件清单，不重新读取文件）；
+    report_diff 为 True 时先与上一次快照比较，输出并写入 context/status_diff.md。
+    """
+    if take_snapshot is None:
+        return
+    snapshot = take_snapshot('.', files, lock_deps)
+    if report_diff:
+        previous = load_snapshot('.')
+        diff = diff_snapshots(previous, snapshot) if previous else None
+        report = render_diff(diff, previous.get('created') if previous else None)
+        if write_status(report, STATUS_DIFF):
+            print(f"\n📝 变化报告已写入: {STATUS_DIFF}\n")
+            print(report)
+    save_snapshot(snapshot)
+
+
+def write_status(content: str, output_file: str = 'context/status.md') -> bool:
+    """原子写入 status.md（临时文件 + rename），读取方不会看到写了一半的文件"""
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"✅ 状态文件已更新: {output_file}")
+        if atomic_write_text is not None:
+            atomic_write_text(output_file, content)
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return True
     except Exception as e:
         print(f"❌ 写入状态文件失败: {e}")
-        return
+        return False
 
-    # 输出运行报告
+
+def print_report(file_count: int, line_count: int):
+    """输出运行报告"""
     print("\n📋 运行报告:")
     print(f"  - 文件数: {file_count}")
     print(f"  - 代码行数: {line_count:,}")
@@ -280,5 +672,128 @@ def main():
         print("\n✨ 运行成功，未发现逻辑警告。")
 
 
+def watch(interval: float = 1.0, debounce: float = 0.5, backend: str = 'auto'):
+    """
+    监听模式：订阅文件系统事件（inotify，不可用时轮询），合并突发事件（git checkout、
+    格式化工具），只重新统计受影响的部分，结果变化时原子写入 status.md。
+    """
+    analyzer = ProjectAnalyzer('.')
+    stats = analyzer.analyze()
+    lock_deps = resolve_lockfiles('.', stats.manifests)
+    write_status(build_status('.', stats, lock_deps))
+    record_snapshot(analyzer.manifest.line_counts(), lock_deps)
+    print(f"✅ 状态文件已更新: context/status.md ({stats.file_count} 个文件, {stats.line_count:,} 行)")
+
+    pending: Set[str] = set()
+    lock = threading.Lock()
+    wake = threading.Event()
+
+    def on_change(paths):
+        # 监听线程回调：只记录路径，分析在主线程进行
+        with lock:
+            pending.update(paths)
+        wake.set()
+
+    watcher = create_watcher('.', on_change, backend=backend, ignore_dirs=IGNORE_DIRS,
+                             debounce=debounce, interval=interval)
+    # 轮询后端只能看到目录变化（文件增删），文件内容修改需按间隔做一次 stat 校验
+    poll_contents = watcher.backend == 'poll'
+    print(f"👀 正在监听项目变化 (后端: {watcher.backend}, 按 Ctrl+C 退出)...")
+    try:
+        while True:
+            woke = wake.wait(timeout=interval)
+            if not woke and not poll_contents:
+                continue
+            wake.clear()
+            with lock:
+                changed_paths = set(pending)
+                pending.clear()
+            new_stats = analyzer.analyze(None if poll_contents else changed_paths)
+            if new_stats == stats:
+                continue  # 只有时间戳会变，不重写
+            stats = new_stats
+            lock_deps = resolve_lockfiles('.', stats.manifests)
+            if write_status(build_status('.', stats, lock_deps)):
+                record_snapshot(analyzer.manifest.line_counts(), lock_deps)
+                stamp = datetime.datetime.now().strftime("%H:%M:%S")
+                print(f"[{stamp}] 🔄 已更新: {stats.file_count} 个文件, {stats.line_count:,} 行")
+    except KeyboardInterrupt:
+        print("\n👋 已停止监听。")
+    finally:
+        watcher.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="生成 context/status.md 项目状态快照")
+    parser.add_argument('--watch', action='store_true', help="持续监听文件变化并自动刷新 status.md")
+    parser.add_argument('--interval', type=float, default=1.0, help="轮询间隔（秒，仅轮询后端）")
+    parser.add_argument('--debounce', type=float, default=0.5, help="事件合并窗口（秒）")
+    parser.add_argument('--backend', choices=('auto', 'inotify', 'poll'), default='auto',
+                        help="监听后端（默认 auto：Linux 上使用 inotify）")
+    parser.add_argument('--monorepo', action='store_true',
+                        help="按子项目（含依赖清单的目录）并行分析，写出 context/packages/ 与根目录汇总")
+    parser.add_argument('--workers', type=int, default=None, help="并行进程数（默认 CPU 核数）")
+    parser.add_argument('--diff', action='store_true',
+                        help=f"报告与上一次运行相比的变化（增删文件、各目录行数变化、依赖变化），写入 {STATUS_DIFF}")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """主函数（argv 为 None 时使用默认参数，便于其他脚本直接调用）"""
+    args = parse_args([] if argv is None else argv)
+    
+    # 切换到项目根目录 (统一使用 PROJECT_ROOT)
+    os.chdir(PROJECT_ROOT)
+    
+    if args.watch:
+        if create_watcher is None or TreeCache is None:
+            print("❌ 监听模式需要 scripts 包 (fs_watcher / tree_cache)")
+            return
+        if args.monorepo or args.diff:
+            print("❌ --watch 暂不支持与 --monorepo / --diff 同时使用")
+            return
+        watch(args.interval, args.debounce, args.backend)
+        return
+
+    print("🔄 正在分析项目状态...")
+
+    if args.monorepo:
+        if TreeCache is None:
+            print("❌ Monorepo 模式需要 scripts 包 (tree_cache / status_manifest)")
+            return
+        totals = run_monorepo(args.workers, args.diff)
+        if totals is not None:
+            print(f"✅ 状态文件已更新: context/status.md 及 {PACKAGES_DIR}/")
+            print_report(*totals)
+            return
+        print("ℹ️  未发现子项目，按单一项目处理。")
+    
+    # 单次遍历完成所有统计
+    analyzer = None
+    if TreeCache is not None:
+        analyzer = ProjectAnalyzer('.', workers=args.workers)
+        stats = analyzer.analyze()
+    else:
+        stats = _walk_project_analysis('.')
+    file_count, line_count = stats.file_count, stats.line_count
+    
+    # 生成内容
+    lock_deps = resolve_lockfiles('.', stats.manifests)
+    content = build_status('.', stats, lock_deps)
+    
+    # 写入文件
+    output_file = 'context/status.md'
+    if not write_status(content, output_file):
+        return
+    print(f"✅ 状态文件已更新: {output_file}")
+
+    if analyzer is not None:
+        record_snapshot(analyzer.manifest.line_counts(), lock_deps, args.diff)
+    elif args.diff:
+        print("❌ --diff 需要 scripts 包 (status_manifest / status_snapshot)")
+
+    print_report(file_count, line_count)
+
+
 if __name__ == '__main__':
-    main()
+    main(sys.argv[1:])
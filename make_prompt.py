@@ -1,5 +1,12 @@
 import os
+import argparse
 import datetime
+import difflib
+import hashlib
+import json
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 # --- Import shared configuration ---
 import sys
 from pathlib import Path
@@ -11,72 +18,114 @@ if str(project_root) not in sys.path:
 
 try:
     from scripts.config import IGNORE_DIRS, EXTENSIONS, PROJECT_ROOT
+    from scripts.tree_cache import TreeCache
+    from scripts.fs_watcher import create_watcher
+    from scripts.prompt_budget import Layer, allocate, estimate_tokens, fit_records, status_variants
+    from scripts.adr_memory import load_memory
+    from scripts.search_index import SearchIndex
+    from scripts.tree_render import fit_tree, render_compact
 except ImportError:
+    render_compact = None
+    load_memory = None
+    TreeCache = None
+    create_watcher = None
+    allocate = None
+    SearchIndex = None
     IGNORE_DIRS = {'.git', '__pycache__', 'node_modules', 'context', '.gemini', '.history', '.agents', 'bmad'}
     EXTENSIONS = {'.py', '.md', '.json', '.js', '.vue', '.ps1', '.sh', '.txt'}
     PROJECT_ROOT = Path(__file__).parent
-    print("Warning: Could not import scripts.config, using fallback defaults.")
+    # stderr: stdout may be an MCP protocol stream (scripts/context_server.py)
+    print("Warning: Could not import scripts.config, using fallback defaults.", file=sys.stderr)
 
 # --- Project size thresholds (for tiered depth strategy) ---
 MAX_FILES_FULL_TREE = 100      # Small project: full tree
 MAX_FILES_TRUNCATED = 300      # Medium project: truncate to 2 levels
 # Over 300 files: show root and first-level subdirs only
 
-def get_tree_structure(startpath):
-    """
-    Auto-generate the project directory tree.
-    Dynamically adjusts depth based on project size to avoid oversized context.
-    """
-    
-    # Single pass: count files and collect directory structure
-    file_count = 0
-    entries = []  # (level, basename, is_dir, files_in_dir)
-    
-    startpath_obj = Path(startpath).resolve()
+# Query-relevant snippets injected from the local BM25 index (0 disables)
+SNIPPET_TOP_K = 3
+
+# Prompt layouts: "sandwich" (query first and last) or "cache" (stable prefix first)
+LAYOUTS = ('sandwich', 'cache')
+# First line of the volatile tail in the cache layout; everything before it is the cacheable prefix
+VOLATILE_MARKER = "[Layer 2: Current Project State (volatile)]:"
+
+# Raw context gathered once per prompt (or held live by LiveContext)
+PromptData = namedtuple('PromptData', ['entries', 'tree', 'status', 'memory'])
+
+def _walk_entries(startpath):
+    """Uncached full walk; used only when scripts.tree_cache is unavailable."""
+    entries = []  # (level, basename, matched_files)
+    suffixes = tuple(EXTENSIONS)  # One C-level endswith() per file
 
     for root, dirs, files in os.walk(startpath):
         # Filter ignored directories
         dirs[:] = [d for d in dirs if d not in IGNORE_DIRS]
         
         # Compute relative depth
-        try:
-            rel_path = Path(root).relative_to(startpath_obj)
-        except ValueError:
-            continue
-
-        level = len(rel_path.parts) if str(rel_path) != '.' else 0
+        rel_root = os.path.relpath(root, startpath)
+        level = 0 if rel_root == '.' else rel_root.count(os.sep) + 1
         
-        matched_files = [f for f in files if any(f.endswith(ext) for ext in EXTENSIONS)]
-        file_count += len(matched_files)
+        matched_files = [f for f in files if f.endswith(suffixes)]
         entries.append((level, os.path.basename(root), matched_files))
+    return entries
+
+def get_tree_structure(startpath):
+    """
+    Auto-generate the project directory tree.
+    Dynamically adjusts depth based on project size to avoid oversized context.
+    """
     
-    # Choose depth strategy based on file count
+    return render_tree(scan_entries(startpath))
+
+def scan_entries(startpath):
+    """Collect (level, basename, matched_files) entries for the tree."""
+    if TreeCache is not None:
+        # Incremental: only directories whose mtime moved are re-listed
+        return TreeCache(startpath).scan()
+    return _walk_entries(startpath)
+
+def _tiered_depth(file_count):
+    """Choose depth strategy based on file count."""
     if file_count <= MAX_FILES_FULL_TREE:
-        depth_limit = None
+        return None, "full tree"
+    if file_count <= MAX_FILES_TRUNCATED:
+        return 2, "2-level depth"
+    return 1, "1-level depth (large project)"
+
+def render_tree(entries, depth_limit='auto'):
+    """
+    Render (level, basename, matched_files) entries.
+    depth_limit: 'auto' for the tiered strategy, None for the full tree, or an int.
+    """
+    file_count = sum(len(matched_files) for _, _, matched_files in entries)
+    
+    if depth_limit == 'auto':
+        depth_limit, strategy = _tiered_depth(file_count)
+    elif depth_limit is None:
         strategy = "full tree"
-    elif file_count <= MAX_FILES_TRUNCATED:
-        depth_limit = 2
-        strategy = "2-level depth"
     else:
-        depth_limit = 1
-        strategy = "1-level depth (large project)"
+        strategy = f"{depth_limit}-level depth"
     
+    if render_compact is not None:
+        # Pattern-collapsed, chain-folded, linear-time rendering
+        return render_compact(entries, depth_limit, strategy=strategy)
+
     # Build tree string with depth limit applied
-    tree_str = f"Project Structure (📊 {file_count} files, strategy: {strategy}):\n"
+    lines = [f"Project Structure (📊 {file_count} files, strategy: {strategy}):"]
     
     for level, basename, matched_files in entries:
         if depth_limit is not None and level > depth_limit:
             continue
         
         indent = ' ' * 4 * level
-        tree_str += f"{indent}{basename}/\n"
+        lines.append(f"{indent}{basename}/")
         
         if depth_limit is None or level < depth_limit:
             subindent = ' ' * 4 * (level + 1)
-            for f in matched_files:
-                tree_str += f"{subindent}{f}\n"
+            lines.extend(f"{subindent}{f}" for f in matched_files)
     
-    return tree_str
+    return "\n".join(lines) + "\n"
 
 def read_file(filepath):
     """Read file content. Accepts absolute paths or paths relative to project root."""
@@ -89,16 +138,324 @@ def read_file(filepath):
             return f.read()
     return ""
 
-def generate_prompt(user_query):
-    # 1. Gather real-time data
-    tree = get_tree_structure(".")
-    status = read_file("context/status.md")
-    memory = read_file("context/memory.md")
-    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+class LiveContext:
+    """
+    In-memory model of the tree and context files for the REPL.
+    A background watcher (inotify, or stat polling) refreshes only what changed,
+    so generate_prompt() just formats data that is already in memory.
+    """
+
+    STATUS_FILE = "context/status.md"
+    MEMORY_FILE = "context/memory.md"
+
+    def __init__(self, startpath="."):
+        self.startpath = os.path.abspath(startpath)
+        self._files = {
+            'status': str(PROJECT_ROOT / self.STATUS_FILE),
+            'memory': str(PROJECT_ROOT / self.MEMORY_FILE),
+        }
+        self._tree_cache = TreeCache(startpath)
+        self._lock = threading.Lock()
+        self._watcher = None
+        self.entries = self._tree_cache.scan()
+        self.tree = render_tree(self.entries)
+        self.status = read_file(self._files['status'])
+        self.memory = read_file(self._files['memory'])
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return self._watcher.backend if self._watcher else None
+
+    def start(self):
+        self._watcher = create_watcher(self.startpath, self._on_change,
+                                       ignore_dirs=IGNORE_DIRS,
+                                       extra_paths=self._files.values())
+        return self
+
+    def stop(self):
+        if self._watcher:
+            self._watcher.stop()
+            self._watcher = None
+
+    def snapshot(self):
+        """Return the PromptData currently held in memory."""
+        with self._lock:
+            return PromptData(self.entries, self.tree, self.status, self.memory)
+
+    def search_snippets(self, query, top_k):
+        """Query the warm index (built on first use, then kept fresh by the watcher)."""
+        with self._index_lock:
+            if self._index is None:
+                self._index = SearchIndex.open(PROJECT_ROOT)
+                self._index.update()
+                self._index.save()
+            return [self._index.snippet(hit) for hit in self._index.search(query, top_k)]
+
+    def _on_change(self, paths):
+        """Watcher callback (background thread): refresh only the affected parts."""
+        updates = {}
+        for key, path in self._files.items():
+            if path in paths:
+                updates[key] = read_file(path)
+
+        tree_paths = paths - set(self._files.values())
+        if tree_paths:
+            if self.startpath in tree_paths:
+                dirty = None  # Overflow or root-level event: stat-validate everything
+            else:
+                dirty = set()
+                for path in tree_paths:
+                    for candidate in (path, os.path.dirname(path)):
+                        rel = os.path.relpath(candidate, self.startpath)
+                        if not rel.startswith('..'):
+                            dirty.add('' if rel == '.' else rel.replace(os.sep, '/'))
+            updates['entries'] = self._tree_cache.scan(dirty=dirty)
+            updates['tree'] = render_tree(updates['entries'])
+
+        with self._lock:
+            for key, value in updates.items():
+                setattr(self, key, value)
+
+        if tree_paths and self._index is not None:
+            with self._index_lock:
+                self._index.update()
+                self._index.save()  # No-op unless the update changed something
+
+class StaticContext:
+    """
+    Context gathered once and shared read-only by many prompts (batch mode).
+    Same snapshot()/search_snippets() interface as LiveContext.
+    """
+
+    def __init__(self, startpath=".", top_k=SNIPPET_TOP_K):
+        self.data = gather_context(startpath)
+        self._index = None
+        if top_k and SearchIndex is not None:
+            self._index = SearchIndex.open(PROJECT_ROOT)
+            self._index.update()
+            self._index.save()
+
+    def snapshot(self):
+        return self.data
+
+    def search_snippets(self, query, top_k):
+        if self._index is None:
+            return []
+        return [self._index.snippet(hit) for hit in self._index.search(query, top_k)]
+
+class PromptSession:
+    """
+    Remembers what earlier prompts in one chat already carried (content hash per
+    section, per ADR record and per snippet), so follow-up prompts send only
+    what changed: new records/snippets, a status diff, a tree delta.
+    """
+
+    UNCHANGED = "[unchanged since previous prompt]"
+    MAX_LISTED_PATHS = 10  # Added/removed paths spelled out in a tree delta
+
+    def __init__(self):
+        self._sent = set()    # Hashes of ADR records, memory preamble and snippets already sent
+        self._status = None   # (hash, full text) last sent
+        self._tree = None     # (hash, (dirs, files)) last sent
+        self._pending = []
+
+    @staticmethod
+    def _hash(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def delta(self, preamble, records, status, tree, entries, snippets):
+        """
+        Reduce the sections to what this session has not seen yet.
+        Returns (preamble, records, status, tree, snippets); call commit() with the
+        final rendered sections afterwards.
+        """
+        self._pending = []
+
+        # Memory: preamble and each ADR record are sent once per session
+        new_records = [text for text in records if self._hash(text) not in self._sent]
+        for text in [preamble] + new_records:
+            self._pending.append(('memory', text, self._hash(text)))
+        if self._hash(preamble) in self._sent:
+            preamble = ""
+        known = len(records) - len(new_records)
+        if known:
+            preamble = _add_note(preamble, f"_({known} ADR(s) sent earlier in this session still apply)_")
+        elif not preamble and not new_records:
+            preamble = self.UNCHANGED + "\n"
+
+        # Status: unchanged note, or a unified diff when that is much shorter
+        digest = self._hash(status)
+        sent_status = status
+        if self._status and self._status[0] == digest:
+            sent_status = self.UNCHANGED + "\n"
+        elif self._status:
+            diff = ''.join(difflib.unified_diff(self._status[1].splitlines(True), status.splitlines(True),
+                                                'status.md (previous)', 'status.md', n=1))
+            if diff and len(diff) < len(status) // 2:
+                sent_status = f"status.md changed since previous prompt:\n```diff\n{diff}```\n"
+        self._pending.append(('status', sent_status, (digest, status)))
+
+        # Tree: unchanged note, or "+N files, -M dirs" with the paths that moved
+        digest = self._hash(tree)
+        sent_tree = tree
+        if self._tree and self._tree[0] == digest:
+            sent_tree = self.UNCHANGED + "\n"
+        paths = _entry_paths(entries)
+        if self._tree and self._tree[0] != digest:
+            sent_tree = self._tree_delta(self._tree[1], paths) or sent_tree
+        self._pending.append(('tree', sent_tree, (digest, paths)))
+
+        # Snippets: skip ones already shown verbatim
+        new_snippets = []
+        for snippet in snippets:
+            digest = self._hash(snippet)
+            if digest not in self._sent:
+                new_snippets.append(snippet)
+                self._pending.append(('snippets', snippet, digest))
+
+        return preamble, new_records, sent_status, sent_tree, new_snippets
+
+    def _tree_delta(self, old, new):
+        (old_dirs, old_files), (new_dirs, new_files) = old, new
+        changes = [
+            ('+', sorted(new_files - old_files), 'file'), ('-', sorted(old_files - new_files), 'file'),
+            ('+', sorted(new_dirs - old_dirs), 'dir'), ('-', sorted(old_dirs - new_dirs), 'dir'),
+        ]
+        summary = [f"{sign}{len(items)} {kind}{'s' if len(items) != 1 else ''}"
+                   for sign, items, kind in changes if items]
+        if not summary:
+            return None  # Only rendering changed (e.g. depth strategy): resend in full
+        lines = [f"tree: {', '.join(summary)} since previous prompt"]
+        listed = [f"  {sign} {path}{'/' if kind == 'dir' else ''}"
+                  for sign, items, kind in changes for path in items]
+        lines.extend(listed[:self.MAX_LISTED_PATHS])
+        if len(listed) > self.MAX_LISTED_PATHS:
+            lines.append(f"  ... and {len(listed) - self.MAX_LISTED_PATHS} more")
+        return "\n".join(lines) + "\n"
+
+    def commit(self, memory, status, tree, snippets_block):
+        """Mark as sent only what survived budget trimming into the final prompt."""
+        for section, text, value in self._pending:
+            if section == 'memory' and text.rstrip('\n') in memory:
+                self._sent.add(value)
+            elif section == 'snippets' and text.rstrip('\n') in snippets_block:
+                self._sent.add(value)
+            elif section == 'status' and text == status:
+                self._status = value
+            elif section == 'tree' and text == tree:
+                self._tree = value
+        self._pending = []
+
+def _entry_paths(entries):
+    """(dirs, files) as '/'-joined relative paths from pre-order tree entries."""
+    dirs, files, stack = set(), set(), []
+    for level, name, matched_files in entries:
+        del stack[level:]
+        stack.append(name)
+        rel = '/'.join(stack[1:])
+        if rel:
+            dirs.add(rel)
+        files.update(f"{rel}/{f}" if rel else f for f in matched_files)
+    return dirs, files
 
-    # 2. Build "sandwich" prompt (core fusion point)
+def gather_context(startpath="."):
+    """Read tree, status and memory from disk for a single prompt."""
+    entries = scan_entries(startpath)
+    return PromptData(entries, render_tree(entries),
+                      read_file("context/status.md"), read_file("context/memory.md"))
+
+def retrieve_snippets(user_query, top_k=SNIPPET_TOP_K, context=None):
+    """Top-k BM25-ranked source snippets for the query (index updated incrementally)."""
+    if not top_k or SearchIndex is None:
+        return []
+    if context is not None:
+        return context.search_snippets(user_query, top_k)
+    index = SearchIndex.open(PROJECT_ROOT)
+    index.update()
+    index.save()
+    return [index.snippet(hit) for hit in index.search(user_query, top_k)]
+
+def format_snippets(snippets):
+    if not snippets:
+        return ""
+    return "\n[Layer 3: Relevant Snippets (BM25)]:\n" + "\n".join(snippets)
+
+def select_memory(memory, user_query, all_adrs=False):
+    """
+    Query-relevant ADR memory: (preamble, [record_text, ...], selection_note).
+    records is empty when memory.md has no ADR sections (the text is then used verbatim).
+    Pinned records (bans, **Pinned**, PINNED_ADRS) are always included.
+    """
+    if load_memory is None:
+        return memory, [], ""
+    parsed = load_memory(memory)
+    if not parsed.records:
+        return memory, [], ""
+    records = parsed.records if all_adrs else parsed.select(user_query)
+    note = ""
+    if len(records) < len(parsed.records):
+        note = f"_({len(records)} of {len(parsed.records)} ADRs shown: pinned + relevant to this query)_"
+    return parsed.preamble, [record.text for record in records], note
+
+def join_memory(preamble, records):
+    return preamble + "\n".join(record.rstrip("\n") + "\n" for record in records)
+
+def _add_note(preamble, note):
+    if not note:
+        return preamble
+    return preamble.rstrip('\n') + "\n\n" + note + "\n" if preamble.strip() else note + "\n"
+
+def fit_to_budget(data, max_tokens, fixed_tokens, snippets=(), stable_first=False, memory_parts=None):
+    """
+    Fit memory/status/snippets/tree into what is left of max_tokens.
+    Priority: ADR memory (constraints) > status (tech stack) > snippets > tree.
+    stable_first: budget the tree right after memory so the cacheable prefix
+                  does not change with per-query snippet sizes.
+    Returns (memory, status, snippets_block, tree, notes).
+    """
+    def fill_memory(budget):
+        # Memory holds the constraints: never drop any of it without a note
+        preamble, records = memory_parts if memory_parts else (data.memory, [])
+        text, omitted, truncated = fit_records(preamble, records, budget)
+        if not text.strip():
+            return text, "omitted" if preamble.strip() or records else None
+        parts = (["truncated"] if truncated else []) + ([f"{omitted} of {len(records)} ADRs omitted"] if omitted else [])
+        return text, "; ".join(parts) or None
+
+    def fill_tree(budget):
+        # Chars-per-token starts at the estimator's ratio and tightens until it fits
+        max_chars = budget * 4
+        while max_chars > 0:
+            text = fit_tree(data.entries, max_chars)
+            if estimate_tokens(text) <= budget:
+                return text, "compacted to fit"
+            max_chars = int(max_chars * 0.9)
+        return "", "omitted"
+
+    def fill_snippets(budget):
+        kept, omitted = [], 0
+        for snippet in snippets:
+            if estimate_tokens(format_snippets(kept + [snippet])) <= budget:
+                kept.append(snippet)
+            else:
+                omitted += 1
+        return format_snippets(kept), (f"{omitted} of {len(snippets)} snippets omitted" if omitted else None)
+
+    layers = [
+        Layer('memory', 1, fill=fill_memory),
+        Layer('status', 2, variants=status_variants(data.status)),
+        Layer('snippets', 3, fill=fill_snippets),
+        Layer('tree', 2 if stable_first else 4, variants=[('tiered', data.tree)], fill=fill_tree),
+    ]
+    chosen, notes = allocate(layers, max_tokens - fixed_tokens)
+    return chosen['memory'], chosen['status'], chosen['snippets'], chosen['tree'], notes
+
+def _render_sandwich(user_query, memory, current_time, status, tree, budget_note="", snippets_block=""):
+    # Build "sandwich" prompt (core fusion point)
     # Order: user query (primacy) -> static memory -> dynamic state -> repeat query (recency)
-    final_prompt = f"""
+    return f"""
 ---
 [SYSTEM INSTRUCTION]: 
 You are an expert developer. Answer the question based strictly on the context below.
@@ -111,11 +468,11 @@ You are an expert developer. Answer the question based strictly on the context b
 
 [Layer 2: Current Project State (RAM)]:
 <current_time>{current_time}</current_time>
-{status}
+{budget_note}{status}
 <file_tree>
 {tree}
 </file_tree>
-
+{snippets_block}
 [Instruction]: 
 Answer the user's question now. 
 1. Check the 'Long-term Memory' for constraints (e.g., banned functions).
@@ -126,14 +483,203 @@ Answer the user's question now.
 "{user_query}"
 ---
 """
-    return final_prompt
+
+def _render_cache_friendly(user_query, memory, current_time, status, tree, budget_note="", snippets_block=""):
+    # Prefix-cache layout: stable content first (rarely changes between prompts),
+    # volatile content (time, status, snippets, query) last.
+    return f"""
+---
+[SYSTEM INSTRUCTION]: 
+You are an expert developer. Answer the question based strictly on the context below.
+1. Check the 'Long-term Memory' for constraints (e.g., banned functions).
+2. Check the 'file_tree' to understand where files are located.
+3. If you write code, ensure it matches the 'status' (Tech Stack).
+
+[Layer 1: Long-term Memory (ADR Logs)]:
+{memory}
+
+<file_tree>
+{tree}
+</file_tree>
+
+{VOLATILE_MARKER}
+<current_time>{current_time}</current_time>
+{budget_note}{status}
+{snippets_block}
+[User Query]: 
+"{user_query}"
+---
+"""
+
+def cacheable_prefix(prompt):
+    """The stable leading part of a cache-layout prompt ("" for other layouts)."""
+    index = prompt.find(VOLATILE_MARKER)
+    return prompt[:index] if index >= 0 else ""
+
+def prefix_hash(prompt):
+    """Short stable hash of the cacheable prefix, for tracking provider cache hit rates."""
+    prefix = cacheable_prefix(prompt)
+    if not prefix:
+        return None
+    digest = hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:16]
+    tokens = estimate_tokens(prefix) if allocate is not None else len(prefix) // 4
+    return f"sha256:{digest} (~{tokens} tokens)"
+
+def generate_prompt(user_query, context=None, max_tokens=None, top_k=SNIPPET_TOP_K, layout='sandwich',
+                    tree_chars=None, all_adrs=False, session=None):
+    # 1. Gather real-time data (from the live in-memory model when available)
+    data = context.snapshot() if context is not None else gather_context(".")
+    if tree_chars and render_compact is not None:
+        data = data._replace(tree=fit_tree(data.entries, tree_chars))
+    # The cache layout keeps the full ADR log so the cacheable prefix stays query-independent
+    preamble, records, selection_note = select_memory(data.memory, user_query, all_adrs or layout == 'cache')
+    snippets = retrieve_snippets(user_query, top_k, context)
+    if session is not None:
+        # Follow-up prompt in the same chat: send only what the session has not seen
+        preamble, records, status, tree, snippets = session.delta(
+            preamble, records, data.status, data.tree, data.entries, snippets)
+        data = data._replace(status=status, tree=tree, memory=preamble)
+    if records:
+        preamble = _add_note(preamble, selection_note)
+    memory = join_memory(preamble, records) if records else data.memory
+    status, tree = data.status, data.tree
+    snippets_block = format_snippets(snippets)
+    current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+
+    # 2. Optional token budget: degrade sections gradually instead of truncating
+    render = _render_cache_friendly if layout == 'cache' else _render_sandwich
+    budget_note = ""
+    if max_tokens and allocate is not None:
+        # Reserve room for the note itself on top of the fixed template cost
+        fixed = estimate_tokens(render(user_query, "", current_time, "", "")) + 40
+        memory, status, snippets_block, tree, notes = fit_to_budget(
+            data, max_tokens, fixed, snippets, stable_first=(layout == 'cache'),
+            memory_parts=(preamble, records) if records else None)
+        if notes:
+            budget_note = f"<context_budget>~{max_tokens} tokens; trimmed: {'; '.join(notes)}</context_budget>\n"
+
+    if session is not None:
+        session.commit(memory, status, tree, snippets_block)
+
+    # 3. Build the prompt
+    return render(user_query, memory, current_time, status, tree, budget_note, snippets_block)
+
+# --- Batch mode ---
+
+_BATCH_CONTEXT = None
+_BATCH_OPTIONS = {}
+
+def _init_batch_worker(context, options):
+    """Pool initializer: the shared context is shipped to each worker once."""
+    global _BATCH_CONTEXT, _BATCH_OPTIONS
+    _BATCH_CONTEXT, _BATCH_OPTIONS = context, options
+
+def _render_batch_item(query):
+    prompt = generate_prompt(query, context=_BATCH_CONTEXT, **_BATCH_OPTIONS)
+    return prompt, prefix_hash(prompt)
+
+def _parse_batch_line(line, query_fields):
+    """Return (record, query, error) for one JSONL line."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {'raw': line.strip()}, None, f"invalid JSON: {e}"
+    if isinstance(record, str):
+        return {'query': record}, record, None
+    if not isinstance(record, dict):
+        return {'raw': record}, None, "expected a JSON object or string"
+    parts = [str(record[f]) for f in query_fields if record.get(f)]
+    if not parts:
+        return record, None, f"missing query field(s): {', '.join(query_fields)}"
+    return record, "\n\n".join(parts), None
+
+def run_batch(lines, out, workers=None, query_fields=('query',), **options):
+    """
+    Stream prompts for JSONL queries as JSONL, in input order.
+    Tree/memory/status (and the snippet index) are built once and shared by all workers.
+    Returns (prompts written, error records written).
+    """
+    workers = workers or os.cpu_count() or 1
+    context = StaticContext(".", top_k=options.get('top_k', SNIPPET_TOP_K))
+    _init_batch_worker(context, options)
+
+    counts = [0, 0]
+
+    def emit(record, result, error):
+        counts[bool(error)] += 1
+        if error:
+            record = {**record, 'error': error}
+        else:
+            prompt, cache_hash = result
+            record = {**record, 'prompt': prompt}
+            if cache_hash:
+                record['prefix_hash'] = cache_hash
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    items = (_parse_batch_line(line, query_fields) for line in lines if line.strip())
+    if workers <= 1:
+        for record, query, error in items:
+            emit(record, None if error else _render_batch_item(query), error)
+        return tuple(counts)
+
+    # Bounded in-flight window keeps memory flat and output ordered while streaming
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(context, options)) as pool:
+        pending = deque()
+        for record, query, error in items:
+            pending.append((record, None if error else pool.submit(_render_batch_item, query), error))
+            if len(pending) >= workers * 4:
+                record, future, error = pending.popleft()
+                emit(record, future.result() if future else None, error)
+        while pending:
+            record, future, error = pending.popleft()
+            emit(record, future.result() if future else None, error)
+    return tuple(counts)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="DCIP: build a context-injected prompt for an AI assistant.")
+    parser.add_argument('query', nargs='*', help="Question (omit to start the interactive console)")
+    parser.add_argument('--max-tokens', type=int, default=None,
+                        help="Token budget for the whole prompt; sections degrade gradually to fit")
+    parser.add_argument('--top-k', type=int, default=SNIPPET_TOP_K,
+                        help=f"Relevant source snippets to inject via BM25 (default {SNIPPET_TOP_K}, 0 disables)")
+    parser.add_argument('--tree-chars', type=int, default=None,
+                        help="Target size of the file tree; keeps as much structure as fits")
+    parser.add_argument('--all-adrs', action='store_true',
+                        help="Inject every ADR from context/memory.md instead of only query-relevant ones")
+    parser.add_argument('--session', action='store_true',
+                        help="Console only: after the first prompt, send only sections that changed")
+    parser.add_argument('--layout', choices=LAYOUTS, default='sandwich',
+                        help="'cache' puts stable context first for provider prompt caching")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Read queries from a JSONL file ('-' for stdin) and write JSONL prompts to stdout")
+    parser.add_argument('--query-field', default='query',
+                        help="Comma-separated JSONL field(s) joined into the query (default: query)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Batch worker processes (default: CPU count)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    # Check if interactive mode (no args)
-    if len(sys.argv) > 1:
+    args = parse_args()
+    if args.batch:
+        # Batch mode: JSONL in -> JSONL out
+        fields = tuple(f.strip() for f in args.query_field.split(',') if f.strip())
+        options = dict(max_tokens=args.max_tokens, top_k=args.top_k, layout=args.layout,
+                       tree_chars=args.tree_chars, all_adrs=args.all_adrs)
+        if args.batch == '-':
+            prompts, errors = run_batch(sys.stdin, sys.stdout, args.workers, fields, **options)
+        else:
+            with open(args.batch, 'r', encoding='utf-8') as f:
+                prompts, errors = run_batch(f, sys.stdout, args.workers, fields, **options)
+        print(f"Generated {prompts} prompt(s), {errors} error(s).", file=sys.stderr)
+    # Check if interactive mode (no query)
+    elif args.query:
         # One-shot mode
-        query = " ".join(sys.argv[1:])
-        prompt = generate_prompt(query)
+        query = " ".join(args.query)
+        prompt = generate_prompt(query, max_tokens=args.max_tokens, top_k=args.top_k, layout=args.layout,
+                                 tree_chars=args.tree_chars, all_adrs=args.all_adrs)
+        if args.layout == 'cache':
+            print(f"Cache prefix: {prefix_hash(prompt)}", file=sys.stderr)
         try:
             import pyperclip
             pyperclip.copy(prompt)
@@ -145,6 +691,8 @@ if __name__ == "__main__":
         print("="*60)
         print("DCIP Console: Dynamic Context Injection")
         print("   (type 'q' or 'exit' to quit)")
+        if args.session:
+            print("   (session mode: type 'new' when you start a new chat)")
         print("="*60)
         
         try:
@@ -155,6 +703,17 @@ if __name__ == "__main__":
             print("Info: pyperclip not found. Output will be printed to screen.")
             print("   (install with: pip install pyperclip)")
 
+        # Keep tree/status/memory warm in memory between questions
+        live_context = None
+        if TreeCache is not None and create_watcher is not None:
+            try:
+                live_context = LiveContext(".").start()
+                print(f"Info: live context enabled (watcher: {live_context.backend}).")
+            except Exception as e:
+                print(f"Info: live context unavailable ({e}); rescanning per question.")
+
+        session = PromptSession() if args.session else None
+
         while True:
             try:
                 query = input("\n[DCIP] Enter your question: ").strip()
@@ -163,8 +722,16 @@ if __name__ == "__main__":
                     break
                 if not query:
                     continue
+                if session is not None and query.lower() == 'new':
+                    session = PromptSession()
+                    print("Session reset: the next prompt carries the full context.")
+                    continue
                     
-                prompt = generate_prompt(query)
+                prompt = generate_prompt(query, context=live_context, max_tokens=args.max_tokens,
+                                         top_k=args.top_k, layout=args.layout, tree_chars=args.tree_chars,
+                                         all_adrs=args.all_adrs, session=session)
+                if args.layout == 'cache':
+                    print(f"Cache prefix: {prefix_hash(prompt)}")
                 
                 if HAS_CLIPBOARD:
                     try:
@@ -184,3 +751,6 @@ if __name__ == "__main__":
                 break
             except Exception as e:
                 print(f"Error: {e}")
+
+        if live_context is not None:
+            live_context.stop()
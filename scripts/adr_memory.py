@@ -0,0 +1,150 @@
+"""
+ADR Memory Index
+
+Parses context/memory.md into '## [ADR-NNN]' records once per content hash
+and indexes them by keywords, tags and banned constraints, so each prompt
+carries only the decisions relevant to its query plus a small pinned set.
+
+Record fields come from '- **Key**: value' bullets. Optional fields:
+    - **Tags**: security, shell
+    - **Pinned**: yes
+"""
+
+import hashlib
+import pickle
+import re
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from scripts.config import CACHE_DIR, PINNED_ADRS
+from scripts.search_index import tokenize
+from scripts.utils import save_cache_quietly
+
+CACHE_FILE = CACHE_DIR / 'adr_memory.pickle'
+
+_HEADER = re.compile(r'^## \[(ADR-[^\]]+)\]\s*(.*)$', re.MULTILINE)
+_FIELD = re.compile(r'^\s*-\s*\*\*([^*]+)\*\*\s*:\s*(.*)$', re.MULTILINE)
+_BACKTICK = re.compile(r'`([^`]+)`')
+_BAN_LINE = re.compile(r'\b(forbid\w*|ban\w*|disable\w*|prohibit\w*|never|must not|do not)\b', re.IGNORECASE)
+_BAN_OBJECT = re.compile(r'\b(?:forbid|ban|disable|prohibit)\w*\s+(\w+)', re.IGNORECASE)
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in is it of on or that the this to with all
+use used using must should only any via per not no do does can may will into
+""".split())
+
+# Relevance weights per match type
+WEIGHT_KEYWORD = 1
+WEIGHT_TAG = 2
+WEIGHT_BANNED = 3
+
+# In-process cache: content sha1 -> AdrMemory
+_PARSED: Dict[str, 'AdrMemory'] = {}
+
+
+class AdrRecord:
+    """One '## [ADR-NNN] Title' section of memory.md."""
+
+    def __init__(self, adr_id: str, title: str, text: str, fields: Dict[str, str]):
+        self.adr_id = adr_id
+        self.title = title
+        self.text = text
+        self.fields = fields
+        self.tags: FrozenSet[str] = self._extract_tags()
+        self.banned: FrozenSet[str] = self._extract_banned()
+        self.keywords: FrozenSet[str] = frozenset(
+            t for t in tokenize(f"{title}\n{text}") if t not in STOPWORDS and len(t) > 1)
+        self.pinned = (self.adr_id in PINNED_ADRS
+                       or fields.get('pinned', '').strip().lower() in ('yes', 'true', '1')
+                       or bool(self.banned))
+
+    def _extract_tags(self) -> FrozenSet[str]:
+        tags = {t.strip().lower() for t in self.fields.get('tags', '').split(',') if t.strip()}
+        if ':' in self.title:
+            # "Security: Disable Eval" -> tag "security"
+            tags.add(self.title.split(':', 1)[0].strip().lower())
+        return frozenset(tags)
+
+    def _extract_banned(self) -> FrozenSet[str]:
+        banned: Set[str] = set()
+        for line in [self.title] + self.text.splitlines():
+            if not _BAN_LINE.search(line):
+                continue
+            banned.update(term.strip().lower() for term in _BACKTICK.findall(line))
+            banned.update(obj.lower() for obj in _BAN_OBJECT.findall(line) if obj.lower() not in STOPWORDS)
+        return frozenset(banned)
+
+
+def parse_memory(text: str) -> Tuple[str, List[AdrRecord]]:
+    """Split memory.md into its preamble and parsed ADR records (file order)."""
+    matches = list(_HEADER.finditer(text))
+    if not matches:
+        return text, []
+    records = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.start():end].rstrip() + '\n'
+        fields = {k.strip().lower(): v.strip() for k, v in _FIELD.findall(body)}
+        records.append(AdrRecord(match.group(1), match.group(2).strip(), body, fields))
+    return text[:matches[0].start()], records
+
+
+def build_index(records: Sequence[AdrRecord]) -> Dict[str, List[Tuple[int, int]]]:
+    """term -> [(record_index, weight), ...] over keywords, tags and banned terms."""
+    index: Dict[str, List[Tuple[int, int]]] = {}
+    for i, record in enumerate(records):
+        for term in record.keywords:
+            index.setdefault(term, []).append((i, WEIGHT_KEYWORD))
+        for tag in record.tags:
+            for term in tokenize(tag) or [tag]:
+                index.setdefault(term, []).append((i, WEIGHT_TAG))
+        for term in record.banned:
+            index.setdefault(term, []).append((i, WEIGHT_BANNED))
+    return index
+
+
+class AdrMemory:
+    """Parsed memory.md: preamble, records and their term index."""
+
+    def __init__(self, preamble: str, records: List[AdrRecord]):
+        self.preamble = preamble
+        self.records = records
+        self.index = build_index(records)
+
+    def select(self, query: str, limit: Optional[int] = None) -> List[AdrRecord]:
+        """
+        Pinned records plus records matching the query, returned in file order.
+        limit caps the number of non-pinned matches (highest scores kept).
+        """
+        scores: Dict[int, int] = {}
+        for term in set(tokenize(query)):
+            for i, weight in self.index.get(term, ()):
+                scores[i] = scores.get(i, 0) + weight
+
+        matched = sorted((i for i in scores if not self.records[i].pinned), key=lambda i: -scores[i])
+        if limit is not None:
+            matched = matched[:limit]
+        chosen = set(matched) | {i for i, record in enumerate(self.records) if record.pinned}
+        return [self.records[i] for i in sorted(chosen)]
+
+
+def load_memory(text: str) -> AdrMemory:
+    """Parsed and indexed memory, cached by content hash (in-process, then on disk)."""
+    key = text + '\0' + ','.join(sorted(PINNED_ADRS))  # Pinning is resolved at parse time
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    cached = _PARSED.get(digest)
+    if cached is not None:
+        return cached
+
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            stored_digest, memory = pickle.load(f)
+        if stored_digest == digest:
+            _PARSED[digest] = memory
+            return memory
+    except Exception:
+        pass  # Missing or stale cache
+
+    memory = AdrMemory(*parse_memory(text))
+    _PARSED[digest] = memory
+    save_cache_quietly(CACHE_FILE, pickle.dumps((digest, memory), protocol=pickle.HIGHEST_PROTOCOL))
+    return memory
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scripts.yaml_subset vs PyYAML (pure-Python SafeLoader and libyaml CSafeLoader)
+
+Parses each YAML file in the project (or the given files) repeatedly and
+reports the best per-load time, plus whether the subset parser produced the
+same structure as SafeLoader.
+
+Usage:
+    python scripts/bench_yaml.py                    # all project YAML files
+    python scripts/bench_yaml.py AGENTS_INDEX.yaml -n 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from scripts.config import PROJECT_ROOT  # noqa: E402
+from scripts.yaml_subset import loads  # noqa: E402
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+def _loaders() -> Dict[str, Callable[[str], object]]:
+    loaders = {'yaml_subset': loads}
+    if yaml is not None:
+        loaders['pyyaml (pure)'] = lambda text: yaml.load(text, Loader=yaml.SafeLoader)
+        if hasattr(yaml, 'CSafeLoader'):
+            loaders['pyyaml (libyaml)'] = lambda text: yaml.load(text, Loader=yaml.CSafeLoader)
+    return loaders
+
+
+def _best_time(load: Callable[[str], object], text: str, rounds: int) -> float:
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        load(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _project_yaml_files() -> List[Path]:
+    skip = {'.git', 'node_modules', '__pycache__'}
+    return sorted(p for p in PROJECT_ROOT.rglob('*.yaml') if not skip.intersection(p.parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the YAML subset parser against PyYAML.")
+    parser.add_argument('files', nargs='*', help="YAML files (default: all *.yaml in the project)")
+    parser.add_argument('-n', '--rounds', type=int, default=50, help="Loads per file and parser (best is kept)")
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or _project_yaml_files()
+    loaders = _loaders()
+    if yaml is None:
+        print("PyYAML not installed: timing yaml_subset only.\n")
+
+    totals = dict.fromkeys(loaders, 0.0)
+    mismatches = []
+    names = list(loaders)
+    print(f"{'file':<60} {'bytes':>7}  " + '  '.join(f"{n:>17}" for n in names))
+    for path in files:
+        text = path.read_text(encoding='utf-8')
+        row = []
+        for name, load in loaders.items():
+            seconds = _best_time(load, text, args.rounds)
+            totals[name] += seconds
+            row.append(f"{seconds * 1000:>14.3f} ms")
+        if yaml is not None and loads(text) != yaml.load(text, Loader=yaml.SafeLoader):
+            mismatches.append(path)
+        label = str(path.relative_to(PROJECT_ROOT) if path.is_absolute() else path)
+        print(f"{label[-60:]:<60} {len(text):>7}  " + '  '.join(row))
+
+    print(f"\n{'total':<60} {'':>7}  " + '  '.join(f"{totals[n] * 1000:>14.3f} ms" for n in names))
+    base = totals['yaml_subset']
+    for name in names[1:]:
+        print(f"  yaml_subset is {totals[name] / base:.1f}x faster than {name}")
+    if yaml is not None:
+        print(f"  structure identical to SafeLoader: {len(files) - len(mismatches)}/{len(files)} files")
+        for path in mismatches:
+            print(f"    differs: {path}")
+
+
+if __name__ == '__main__':
+    main()
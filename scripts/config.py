@@ -4,21 +4,32 @@ Centralized Configuration for Project Scripts
 Eliminates code duplication (DRY) and unifies path handling logic.
 """
 
+import hashlib
+import marshal
 import os
+import time
 from pathlib import Path
 
 # --- Core Path Logic ---
 try:
-    from scripts.utils import get_project_root, load_yaml_config
+    from scripts.utils import atomic_write_bytes, get_project_root, load_yaml_config
 except ImportError:
     # Fallback when config.py is executed directly (not recommended)
     import sys
     sys.path.append(str(Path(__file__).resolve().parent.parent))
-    from scripts.utils import get_project_root, load_yaml_config
+    from scripts.utils import atomic_write_bytes, get_project_root, load_yaml_config
 
 # Global project root
 PROJECT_ROOT = get_project_root()
 
+# Persistent caches (tree snapshots, indexes); lives under the ignored context/ dir
+CACHE_DIR = PROJECT_ROOT / 'context' / '.cache'
+
+# Files and directories modified this recently are not trusted by mtime on the
+# next run: on filesystems with coarse timestamps a second change within the
+# same tick would leave the mtime untouched (git's "racily clean" entries)
+RACY_WINDOW_NS = 2 * 1_000_000_000
+
 # --- Unified Constants ---
 
 # Directories to ignore during file tree generation
@@ -43,6 +54,69 @@ EXTENSIONS = {
     '.vue', '.ps1', '.sh', '.txt', '.yaml', '.yml', '.toml'
 }
 
+# Also skip whatever git ignores (root and nested .gitignore files, .git/info/exclude)
+RESPECT_GITIGNORE = True
+
+# How the tree snapshot (scripts/fsindex.py) enumerates files: 'walk' (os.scandir,
+# mtime-validated), 'git' (tracked files read straight from .git/index, no walk)
+# or 'git+untracked' (index plus the walk for untracked files). Outside a git
+# checkout the git modes fall back to 'walk'. Override with AGENTS_FS_BACKEND.
+# Tradeoff: the git modes stat() every tracked file on each run (unstaged
+# deletions are still in the index), while a warm 'walk' stat()s only
+# directories; 'git' wins on cold runs and trees full of ignored/untracked dirs.
+FS_BACKEND = os.environ.get('AGENTS_FS_BACKEND', 'walk')
+
+# Size policy for project analysis (context/auto_status.py): files at least
+# LARGE_FILE_BYTES are 'sample'd (line count estimated from evenly spaced chunks,
+# with an error bound), 'skip'ped (flagged, not read) or fully 'count'ed.
+LARGE_FILE_BYTES = 8 * 1024 * 1024
+LARGE_FILE_POLICY = 'sample'
+
+# ADRs always injected into prompts regardless of query relevance
+# (records with banned constraints or a "**Pinned**: yes" field are pinned automatically)
+PINNED_ADRS = set()
+
+# --- Compiled Registry (AGENTS_INDEX.yaml) ---
+INDEX_PATH = PROJECT_ROOT / 'AGENTS_INDEX.yaml'
+# Parsed index, marshalled; reused while the YAML's (mtime, size) or content hash match
+INDEX_CACHE_FILE = CACHE_DIR / 'agents_index.marshal'
+_INDEX_CACHE_VERSION = 2
+
+
+def load_index() -> dict:
+    """
+    Parsed AGENTS_INDEX.yaml ({} if missing), served from a compiled cache.
+    A stat match skips reading the YAML; a hash match (e.g. after a touch or
+    checkout) skips parsing it; otherwise it is parsed and the cache rewritten.
+    """
+    try:
+        st = INDEX_PATH.stat()
+    except OSError:
+        return {}
+    cached = None
+    try:
+        cached = marshal.loads(INDEX_CACHE_FILE.read_bytes())
+        if cached[0] == _INDEX_CACHE_VERSION and cached[1:3] == (st.st_mtime_ns, st.st_size):
+            return cached[4]
+    except (OSError, EOFError, ValueError, TypeError, IndexError):
+        cached = None
+
+    raw = INDEX_PATH.read_bytes()
+    digest = hashlib.sha1(raw).hexdigest()
+    if cached and cached[0] == _INDEX_CACHE_VERSION and cached[3] == digest:
+        data = cached[4]
+    else:
+        data = load_yaml_config(INDEX_PATH) or {}
+    # Racily-written YAML (see RACY_WINDOW_NS) is only trusted by hash
+    mtime_ns = -1 if st.st_mtime_ns >= time.time_ns() - RACY_WINDOW_NS else st.st_mtime_ns
+    try:
+        atomic_write_bytes(INDEX_CACHE_FILE, marshal.dumps(
+            (_INDEX_CACHE_VERSION, mtime_ns, st.st_size, digest, data)))
+    except (OSError, ValueError):
+        pass  # Unmarshallable values or a read-only checkout: just parse next time
+    return data
+
+
 # --- Dynamic Core File List ---
 def _load_core_files() -> set:
     """Load the core file list from AGENTS_INDEX.yaml, merged with baseline defaults."""
@@ -53,26 +127,22 @@ def _load_core_files() -> set:
         'scripts/', '.agents/', 'context/'
     }
     
-    yaml_path = PROJECT_ROOT / 'AGENTS_INDEX.yaml'
-    if not yaml_path.exists():
-        return defaults
-        
-    data = load_yaml_config(yaml_path)
-    registry = data.get('registry', {})
-    
-    yaml_files = set()
+    # Registry entries, paths already normalized (forward slashes, no leading ./)
+    from scripts.registry import load_registry  # Deferred: registry imports config
+    yaml_files = set(load_registry().paths())
     
-    # Traverse all registry sections (context, languages, etc.)
-    for section, items in registry.items():
-        if isinstance(items, list):
-            for item in items:
-                if isinstance(item, dict) and 'path' in item:
-                    # Normalize path: use forward slashes, strip leading ./
-                    raw_path = item['path'].replace('\\', '/')
-                    if raw_path.startswith('./'):
-                        raw_path = raw_path[2:]
-                    yaml_files.add(raw_path)
-                    
     return defaults.union(yaml_files)
 
-CORE_FILES = _load_core_files()
+
+# Computed on first access (PEP 562), so importing config never parses the YAML
+_LAZY = {
+    'CORE_FILES': _load_core_files,
+    'REGISTRY': lambda: load_index().get('registry') or {},
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = globals()[name] = _LAZY[name]()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Local Context Server (MCP over stdio, or JSON-RPC over a Unix socket)
+
+Long-lived process that keeps parsed config, the project tree, context
+files and the snippet index warm between calls, so editor integrations no
+longer pay interpreter startup plus a full rescan per request.
+
+Tools (MCP `tools/call`, or the same names as plain JSON-RPC methods):
+    generate_prompt   {query, max_tokens?, top_k?, layout?, all_adrs?}
+    tree_snapshot     {depth?}
+    refresh_status    {}
+    compute_asset_id  {asset? | path?}
+
+Usage:
+    python scripts/context_server.py                 # MCP stdio transport
+    python scripts/context_server.py --socket PATH   # newline-delimited JSON-RPC on a Unix socket
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from scripts.config import PROJECT_ROOT  # noqa: E402
+
+import make_prompt  # noqa: E402
+
+SERVER_NAME = "agents-context"
+SERVER_VERSION = "1.0.0"
+PROTOCOL_VERSION = "2024-11-05"
+
+AUTO_STATUS_PATH = PROJECT_ROOT / 'context' / 'auto_status.py'
+ASSET_ID_PATH = PROJECT_ROOT / '.agents' / 'skills' / 'evo-asset' / 'scripts' / 'compute_asset_id.py'
+
+TOOLS = [
+    {
+        "name": "generate_prompt",
+        "description": "Build a DCIP context-injected prompt (ADR memory, status, tree, snippets) for a question.",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string"},
+                "max_tokens": {"type": "integer", "description": "Optional token budget"},
+                "top_k": {"type": "integer", "description": "BM25 snippets to inject"},
+                "layout": {"type": "string", "enum": list(make_prompt.LAYOUTS)},
+                "all_adrs": {"type": "boolean", "description": "Inject all ADRs, not only relevant ones"},
+            },
+            "required": ["query"],
+        },
+    },
+    {
+        "name": "tree_snapshot",
+        "description": "Current project tree (served from the in-memory model).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"depth": {"type": "integer", "description": "Depth limit (omit for tiered default)"}},
+        },
+    },
+    {
+        "name": "refresh_status",
+        "description": "Regenerate context/status.md and return its content.",
+        "inputSchema": {"type": "object", "properties": {}},
+    },
+    {
+        "name": "compute_asset_id",
+        "description": "Canonical sha256 asset_id for an EvoMap asset (inline JSON object or file path).",
+        "inputSchema": {
+            "type": "object",
+            "properties": {"asset": {"type": "object"}, "path": {"type": "string"}},
+        },
+    },
+]
+
+
+class RpcError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _load_module(name: str, path: Path):
+    """Import a script that is not on a package path (same approach as verify_readme_links)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class ContextServer:
+    """Holds warm state and dispatches tool calls."""
+
+    def __init__(self, watch: bool = True):
+        os.chdir(PROJECT_ROOT)  # make_prompt resolves the tree relative to the CWD
+        self._lock = threading.Lock()
+        self._modules: Dict[str, Any] = {}
+        self.context = None
+        try:
+            if watch:
+                self.context = make_prompt.LiveContext(".").start()
+        except Exception as e:
+            print(f"Info: live context unavailable ({e}); reading from disk per call.", file=sys.stderr)
+            self.context = None
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], str]] = {
+            'generate_prompt': self.generate_prompt,
+            'tree_snapshot': self.tree_snapshot,
+            'refresh_status': self.refresh_status,
+            'compute_asset_id': self.compute_asset_id,
+        }
+
+    def _module(self, name: str, path: Path):
+        if name not in self._modules:
+            self._modules[name] = _load_module(name, path)
+        return self._modules[name]
+
+    # --- Tools ---
+
+    def generate_prompt(self, args: Dict[str, Any]) -> str:
+        query = args.get('query')
+        if not query:
+            raise RpcError(-32602, "'query' is required")
+        return make_prompt.generate_prompt(
+            query, context=self.context,
+            max_tokens=args.get('max_tokens'),
+            top_k=args.get('top_k', make_prompt.SNIPPET_TOP_K),
+            layout=args.get('layout', 'sandwich'),
+            all_adrs=bool(args.get('all_adrs')),
+        )
+
+    def tree_snapshot(self, args: Dict[str, Any]) -> str:
+        data = self.context.snapshot() if self.context else make_prompt.gather_context(".")
+        depth = args.get('depth')
+        return data.tree if depth is None else make_prompt.render_tree(data.entries, depth_limit=depth)
+
+    def refresh_status(self, args: Dict[str, Any]) -> str:
+        auto_status = self._module('auto_status', AUTO_STATUS_PATH)
+        auto_status.WARNINGS.clear()
+        # auto_status reports progress on stdout, which is our protocol channel
+        with contextlib.redirect_stdout(sys.stderr):
+            auto_status.main()
+        os.chdir(PROJECT_ROOT)
+        return make_prompt.read_file("context/status.md")
+
+    def compute_asset_id(self, args: Dict[str, Any]) -> str:
+        module = self._module('compute_asset_id', ASSET_ID_PATH)
+        asset = args.get('asset')
+        if asset is None and args.get('path'):
+            with open(args['path'], 'r', encoding='utf-8') as f:
+                asset = json.load(f)
+        if not isinstance(asset, dict):
+            raise RpcError(-32602, "provide 'asset' (JSON object) or 'path' to a JSON file")
+        return module.compute_asset_id(asset)
+
+    # --- JSON-RPC / MCP dispatch ---
+
+    def call_tool(self, name: str, args: Dict[str, Any]) -> str:
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise RpcError(-32601, f"Unknown tool: {name}")
+        with self._lock:
+            return handler(args or {})
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == 'initialize':
+            return {
+                "protocolVersion": params.get('protocolVersion', PROTOCOL_VERSION),
+                "capabilities": {"tools": {}},
+                "serverInfo": {"name": SERVER_NAME, "version": SERVER_VERSION},
+            }
+        if method == 'ping':
+            return {}
+        if method == 'tools/list':
+            return {"tools": TOOLS}
+        if method == 'tools/call':
+            try:
+                text = self.call_tool(params.get('name'), params.get('arguments'))
+                return {"content": [{"type": "text", "text": text}], "isError": False}
+            except RpcError as e:
+                if e.code == -32601:
+                    raise
+                return {"content": [{"type": "text", "text": str(e)}], "isError": True}
+            except Exception as e:
+                return {"content": [{"type": "text", "text": f"{type(e).__name__}: {e}"}], "isError": True}
+        # Plain JSON-RPC shortcut: method name == tool name, result is the text
+        return self.call_tool(method, params)
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """Process one JSON-RPC message; returns the response line (None for notifications)."""
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            return json.dumps({"jsonrpc": "2.0", "id": None,
+                               "error": {"code": -32700, "message": f"Parse error: {e}"}})
+        if not isinstance(message, dict):
+            return json.dumps({"jsonrpc": "2.0", "id": None,
+                               "error": {"code": -32600, "message": "Invalid request"}})
+        msg_id = message.get('id')
+        method = message.get('method', '')
+        try:
+            result = self.dispatch(method, message.get('params') or {})
+        except RpcError as e:
+            if msg_id is None:
+                return None
+            return json.dumps({"jsonrpc": "2.0", "id": msg_id, "error": {"code": e.code, "message": str(e)}})
+        except Exception as e:
+            if msg_id is None:
+                return None
+            return json.dumps({"jsonrpc": "2.0", "id": msg_id,
+                               "error": {"code": -32603, "message": f"{type(e).__name__}: {e}"}})
+        if msg_id is None:
+            return None  # Notification (e.g. notifications/initialized)
+        return json.dumps({"jsonrpc": "2.0", "id": msg_id, "result": result}, ensure_ascii=False)
+
+    def close(self) -> None:
+        if self.context is not None:
+            self.context.stop()
+
+
+def serve_stdio(server: ContextServer) -> None:
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        response = server.handle_line(line)
+        if response is not None:
+            sys.stdout.write(response + "\n")
+            sys.stdout.flush()
+
+
+def serve_socket(server: ContextServer, socket_path: str) -> None:
+    import socketserver
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for raw in self.rfile:
+                line = raw.decode('utf-8', errors='replace')
+                if not line.strip():
+                    continue
+                response = server.handle_line(line)
+                if response is not None:
+                    self.wfile.write((response + "\n").encode('utf-8'))
+                    self.wfile.flush()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with socketserver.ThreadingUnixStreamServer(socket_path, Handler) as srv:
+        print(f"Listening on {socket_path}", file=sys.stderr)
+        try:
+            srv.serve_forever()
+        finally:
+            os.unlink(socket_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm local context server (MCP stdio / Unix socket).")
+    parser.add_argument('--socket', metavar='PATH', help="Serve JSON-RPC on a Unix socket instead of stdio")
+    parser.add_argument('--no-watch', action='store_true', help="Disable the filesystem watcher")
+    args = parser.parse_args()
+
+    server = ContextServer(watch=not args.no_watch)
+    try:
+        if args.socket:
+            serve_socket(server, args.socket)
+        else:
+            serve_stdio(server)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+"""
+Filesystem Watcher
+
+Background change notification for long-running tools (REPL, daemons).
+Uses inotify via ctypes on Linux and falls back to stat polling elsewhere
+(or when inotify is unavailable / out of watches). Zero third-party deps.
+
+Callbacks receive a set of absolute paths: changed entries and/or the
+directories whose listing changed. The root path itself means "anything may
+have changed" (e.g. inotify queue overflow) and calls for a full rescan.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from scripts.config import IGNORE_DIRS
+from scripts.pathfilter import GITIGNORE, PathFilter
+
+ChangeCallback = Callable[[Set[str]], None]
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+class BaseWatcher:
+    """Common thread/debounce plumbing shared by all backends."""
+
+    backend = 'base'
+
+    def __init__(self, root: str, on_change: ChangeCallback,
+                 ignore_dirs: Iterable[str] = IGNORE_DIRS,
+                 extra_paths: Iterable[str] = (),
+                 debounce: float = 0.1,
+                 path_filter: Optional[PathFilter] = None):
+        self.root = os.path.abspath(root)
+        self.on_change = on_change
+        # Directories are pruned like the tree walkers prune them (names + .gitignore)
+        self.path_filter = path_filter or PathFilter(self.root, ignore_dirs=ignore_dirs)
+        # Files watched individually even if they live in an ignored dir (e.g. context/status.md)
+        self.extra_paths = {os.path.abspath(p) for p in extra_paths}
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pending: Set[str] = set()
+        self._last_event = 0.0
+
+    def start(self) -> 'BaseWatcher':
+        self._setup()
+        self._thread = threading.Thread(target=self._run, name=f"{self.backend}-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._teardown()
+
+    def _queue(self, paths: Iterable[str]) -> None:
+        self._pending.update(paths)
+        self._last_event = time.monotonic()
+
+    def _flush_if_quiet(self) -> None:
+        """Deliver queued paths once no new event arrived for `debounce` seconds."""
+        if self._pending and time.monotonic() - self._last_event >= self.debounce:
+            batch, self._pending = self._pending, set()
+            try:
+                self.on_change(batch)
+            except Exception as e:
+                print(f"Warning: watcher callback failed: {e}", file=sys.stderr)
+
+    def _rel(self, path: str) -> str:
+        rel = os.path.relpath(path, self.root)
+        return '' if rel == '.' else rel.replace(os.sep, '/')
+
+    def _iter_dirs(self, top: str):
+        """Yield `top` and every non-ignored directory below it."""
+        stack = [(top, self._rel(top))]
+        while stack:
+            current, rel = stack.pop()
+            yield current
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False) and self.path_filter.keep_dir(rel, entry.name):
+                            stack.append((entry.path, f"{rel}/{entry.name}" if rel else entry.name))
+            except OSError:
+                continue
+
+    def _setup(self) -> None:
+        pass
+
+    def _teardown(self) -> None:
+        pass
+
+    def _run(self) -> None:
+        raise NotImplementedError
+
+
+class PollingWatcher(BaseWatcher):
+    """Portable fallback: compares directory and extra-file mtimes every `interval` seconds."""
+
+    backend = 'poll'
+
+    def __init__(self, *args, interval: float = 1.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+        self._mtimes: Dict[str, int] = {}
+
+    def _snapshot(self) -> Dict[str, int]:
+        mtimes = {}
+        for path in list(self._iter_dirs(self.root)) + sorted(self.extra_paths):
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return mtimes
+
+    def _setup(self) -> None:
+        self._mtimes = self._snapshot()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            current = self._snapshot()
+            changed = {p for p, m in current.items() if self._mtimes.get(p) != m}
+            changed |= set(self._mtimes) - set(current)
+            self._mtimes = current
+            if changed:
+                self._queue(changed)
+            # Polling already coalesces a full interval of events
+            self._last_event = 0.0
+            self._flush_if_quiet()
+
+
+class InotifyWatcher(BaseWatcher):
+    """Linux inotify backend (one watch per non-ignored directory)."""
+
+    backend = 'inotify'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._fd = -1
+        self._wds: Dict[int, str] = {}
+        self._extra_parents: Set[str] = set()  # Watched only for extra_paths, never recursed
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+    def _add_watch(self, path: str) -> None:
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return  # Vanished or unreadable; nothing to watch
+            raise OSError(err, f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+        self._wds[wd] = path
+
+    def _add_tree(self, top: str) -> None:
+        for path in self._iter_dirs(top):
+            self._add_watch(path)
+
+    def _setup(self) -> None:
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        try:
+            self._add_tree(self.root)
+            watched = set(self._wds.values())
+            for parent in {os.path.dirname(p) for p in self.extra_paths} - watched:
+                self._extra_parents.add(parent)
+                self._add_watch(parent)
+        except OSError:
+            self._teardown()
+            raise
+
+    def _teardown(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _handle(self, data: bytes) -> None:
+        offset = 0
+        changed = set()
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed.add(self.root)
+                continue
+            directory = self._wds.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+
+            path = os.path.join(directory, name) if name else directory
+            if directory in self._extra_parents:
+                if path in self.extra_paths:
+                    changed.add(path)
+                continue
+            if name == GITIGNORE:
+                # Rules changed: directories they un-ignore must be watched too
+                self.path_filter.invalidate(self._rel(directory))
+                try:
+                    self._add_tree(directory)
+                except OSError:
+                    changed.add(self.root)
+            elif (mask & (IN_CREATE | IN_MOVED_TO) and mask & IN_ISDIR
+                    and self.path_filter.keep_dir(self._rel(directory), name)):
+                try:
+                    self._add_tree(path)
+                except OSError:
+                    changed.add(self.root)  # Out of watches: force a full rescan
+            changed.add(path)
+        if changed:
+            self._queue(changed)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            timeout = self.debounce if self._pending else 0.5
+            try:
+                ready, _, _ = select.select([self._fd], [], [], timeout)
+            except (OSError, ValueError):
+                break
+            if ready:
+                try:
+                    self._handle(os.read(self._fd, 64 * 1024))
+                except OSError:
+                    break
+            self._flush_if_quiet()
+
+
+def create_watcher(root: str, on_change: ChangeCallback, backend: str = 'auto', **kwargs) -> BaseWatcher:
+    """
+    Build and start a watcher.
+    backend: 'auto' (inotify on Linux, else polling), 'inotify' or 'poll'.
+    """
+    interval = kwargs.pop('interval', 1.0)
+    if backend in ('auto', 'inotify') and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root, on_change, **kwargs).start()
+        except (OSError, AttributeError) as e:
+            if backend == 'inotify':
+                raise
+            print(f"Info: inotify unavailable ({e}), falling back to polling.", file=sys.stderr)
+    return PollingWatcher(root, on_change, interval=interval, **kwargs).start()
@@ -0,0 +1,403 @@
+"""
+Shared Filesystem Snapshot
+
+One FsIndex per (root, ignore configuration) holds every non-ignored file of
+the tree with its stat signature, built by a single os.scandir walk and
+persisted as one compact marshal file under CACHE_DIR. make_prompt,
+auto_status and the search index all read their listings from it (through
+TreeCache views), so a combined run traverses the tree once; later runs only
+re-list directories whose mtime moved.
+
+Extension filtering is NOT part of the snapshot: views decide which files
+they care about, which is what lets tools with different extension or
+manifest needs share one index file.
+"""
+
+import hashlib
+import marshal
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from scripts.config import CACHE_DIR, FS_BACKEND, RACY_WINDOW_NS
+from scripts.gitindex import tracked_files
+from scripts.pathfilter import PathFilter
+from scripts.utils import save_cache_quietly
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_FILE = 'auto'  # One file per root/ignore signature under CACHE_DIR
+BACKENDS = ('walk', 'git', 'git+untracked')
+
+# (size, mtime_ns, inode) as seen by os.stat()
+FileStat = Tuple[int, int, int]
+
+
+class FsIndex:
+    """
+    Persistent, mtime-validated snapshot of one directory tree.
+
+    Record per directory (keyed by path relative to root, '' = root):
+        [mtime_ns, sorted_subdirs, {file_name: [size, mtime_ns, inode]}]
+
+    A directory is re-listed (and its files stat()ed) only when its own mtime
+    moved. File contents can change without touching the directory, so
+    consumers that need exact file stats refresh with restat=True.
+
+    backend: 'walk' lists directories; 'git' takes tracked files from
+    .git/index instead (ignore names still apply, .gitignore does not: tracked
+    files are tracked); 'git+untracked' adds the walk's untracked files.
+    Outside a git checkout both git backends fall back to 'walk'.
+
+    Files deleted from the working tree stay in the index until the deletion
+    is staged, so the git backends stat() every tracked file on each refresh
+    (with a watcher, only those in dirty paths). That replaces directory listings,
+    not the snapshot: a warm 'walk' costs one stat() per directory, 'git' one
+    per tracked file, so 'git' pays off on cold runs and trees dominated by
+    ignored or untracked directories.
+    """
+
+    def __init__(self, root: Union[str, Path],
+                 path_filter: Optional[PathFilter] = None,
+                 index_file: Optional[Union[str, Path]] = DEFAULT_INDEX_FILE,
+                 workers: Optional[int] = None,
+                 backend: Optional[str] = None):
+        self.root = os.path.abspath(str(root))
+        self.filter = path_filter or PathFilter(self.root)
+        self.workers = workers
+        self.backend = backend or FS_BACKEND
+        if self.backend not in BACKENDS:
+            raise ValueError(f"unknown filesystem backend {self.backend!r} (expected one of {BACKENDS})")
+        self.signature = self.filter.walk_signature
+        if index_file == 'auto':
+            key = _signature_key(self.root, self.signature)
+            index_file = CACHE_DIR / f"fsindex-{key}.marshal"
+        self.index_file = Path(index_file) if index_file else None
+        self._dirs: Dict[str, list] = {}    # Walked records (what gets persisted)
+        self._tree: Dict[str, list] = {}    # What queries read: _dirs, tracked files, or both
+        self._gitignores: Dict[str, list] = {}  # rel dir -> [mtime_ns, size] of its .gitignore
+        self._seen_gitignores: Dict[str, list] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.rescanned = 0  # Directories re-listed during the last refresh()
+
+    def load(self) -> None:
+        """Load the persisted snapshot (silently starts empty if missing/stale)."""
+        self._loaded = True
+        if not self.index_file:
+            return
+        try:
+            with open(self.index_file, 'rb') as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return
+        if (isinstance(data, dict) and data.get('version') == INDEX_VERSION
+                and data.get('root') == self.root and data.get('signature') == self.signature):
+            self._dirs = data.get('dirs', {})
+            self._gitignores = data.get('gitignores', {})
+
+    def save(self) -> None:
+        if not self.index_file:
+            return
+        payload = {'version': INDEX_VERSION, 'root': self.root, 'signature': self.signature,
+                   'dirs': self._dirs, 'gitignores': self._gitignores}
+        save_cache_quietly(self.index_file, marshal.dumps(payload))
+
+    # --- Refresh ---
+
+    def refresh(self, dirty: Optional[Set[str]] = None, restat: bool = False, persist: bool = True) -> int:
+        """
+        Bring the snapshot in line with the tree. Returns the number of directories re-listed.
+
+        dirty:  relative paths ('' = root) reported changed by a filesystem watcher.
+                When given, only those directories are re-listed and all others are
+                trusted as-is (with restat, only dirty files are re-stat()ed).
+        restat: also re-stat() files of directories served from the snapshot
+                (tracked files of the git backends are always re-stat()ed).
+        """
+        with self._lock:
+            tracked = tracked_files(self.root) if self.backend != 'walk' else None
+            if tracked is None:
+                self._refresh_walk(dirty, restat, persist)
+                self._tree = self._dirs
+            elif self.backend == 'git':
+                self.rescanned = 0
+                self._tree = self._tracked_records(tracked, dirty)
+            else:
+                self._refresh_walk(dirty, restat, persist)
+                self._tree = _overlay(self._dirs, self._tracked_records(tracked, dirty, self._dirs))
+            return self.rescanned
+
+    def _refresh_walk(self, dirty: Optional[Set[str]], restat: bool, persist: bool) -> None:
+        if not self._loaded:
+            self.load()
+        now_ns = time.time_ns()
+        forced = self._edited_gitignores()
+        self._seen_gitignores = {}
+        cold = not self._dirs
+        fresh: Dict[str, list] = {}
+        counters = [0, 0]  # [directories re-listed, records re-stat()ed with a new signature]
+
+        root_record = self._refresh_dir('', now_ns, dirty, forced, restat, counters)
+        if root_record is not None:
+            fresh[''] = root_record
+            subtrees = root_record[1]
+            args = (now_ns, dirty, restat)
+            if cold and self.workers != 1 and len(subtrees) > 1:
+                # Cold build: fan top-level subtrees out (scandir/stat release the GIL)
+                with ThreadPoolExecutor(self.workers) as pool:
+                    results = list(pool.map(lambda name: self._walk(name, *args, set(forced)), subtrees))
+            else:
+                results = [self._walk(name, *args, forced) for name in subtrees]
+            for records, (relisted, restated) in results:
+                fresh.update(records)
+                counters[0] += relisted
+                counters[1] += restated
+
+        self.rescanned = counters[0]
+        changed = any(counters) or len(fresh) != len(self._dirs)
+        self._dirs = fresh
+        changed = changed or self._seen_gitignores != self._gitignores
+        self._gitignores = self._seen_gitignores
+        if persist and changed:
+            self.save()
+
+    def _tracked_records(self, tracked: Dict[str, FileStat], dirty: Optional[Set[str]],
+                         walked: Optional[Dict[str, list]] = None) -> Dict[str, list]:
+        """
+        Directory records built from the git index (ignore names pruned, nothing listed).
+        Files already present in `walked` records are left out: the walk has fresher stats.
+        Every file is stat()ed (only those dirty or in a dirty directory when given), which
+        drops files deleted from the working tree and refreshes signatures in the same call.
+        """
+        records: Dict[str, list] = {'': [-1, [], {}]}
+        kept: Dict[str, bool] = {'': True}
+        ignored_name = self.filter.ignored_name
+
+        def keep(rel: str) -> bool:
+            verdict = kept.get(rel)
+            if verdict is None:
+                parent, _, name = rel.rpartition('/')
+                verdict = keep(parent) and not ignored_name(name)
+                if verdict:
+                    records[rel] = [-1, [], {}]
+                    records[parent][1].append(name)
+                kept[rel] = verdict
+            return verdict
+
+        for path, signature in tracked.items():
+            rel, _, name = path.rpartition('/')
+            if not keep(rel):
+                continue
+            if walked is not None and name in walked.get(rel, _NO_RECORD)[2]:
+                continue
+            if dirty is None or path in dirty or rel in dirty:
+                # Unstaged deletions stay in the index, and its stats lag behind
+                # unstaged edits (and truncate inodes to 32 bits)
+                try:
+                    st = os.stat(os.path.join(self.root, path))
+                except OSError:
+                    continue  # Deleted in the working tree
+                signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+            records[rel][2][name] = list(signature)
+        for record in records.values():
+            record[1].sort()
+        return records
+
+    def _walk(self, top: str, now_ns: int, dirty: Optional[Set[str]], restat: bool,
+              forced: Set[str]) -> Tuple[Dict[str, list], Tuple[int, int]]:
+        """Refresh one subtree; returns its records and (re-listed, re-stat()ed) counts."""
+        records: Dict[str, list] = {}
+        counters = [0, 0]
+        stack = [top]
+        while stack:
+            rel = stack.pop()
+            record = self._refresh_dir(rel, now_ns, dirty, forced, restat, counters)
+            if record is None:
+                continue
+            records[rel] = record
+            stack.extend(f"{rel}/{name}" for name in record[1])
+        return records, (counters[0], counters[1])
+
+    def _refresh_dir(self, rel: str, now_ns: int, dirty: Optional[Set[str]], forced: Set[str],
+                     restat: bool, counters: List[int]) -> Optional[list]:
+        """Return the up-to-date record for one directory, re-listing only if its mtime moved."""
+        cached = self._dirs.get(rel)
+        if forced and _under_any(rel, forced):
+            cached, dirty = None, None  # Governing .gitignore changed: listing must be redone
+        abs_path = os.path.join(self.root, rel) if rel else self.root
+        if dirty is not None:
+            # A watcher told us exactly what changed: trust everything else without stat()
+            if rel not in dirty and cached is not None:
+                self._carry_gitignore(rel)
+                return self._restat(rel, abs_path, cached, counters, dirty) if restat else cached
+            cached = None
+
+        try:
+            mtime_ns = os.stat(abs_path).st_mtime_ns
+        except OSError:
+            return None
+
+        if cached is not None and cached[0] == mtime_ns:
+            self._carry_gitignore(rel)
+            return self._restat(rel, abs_path, cached, counters) if restat else cached
+
+        if self.filter.use_gitignore:
+            # A new, edited or deleted .gitignore here changes what the whole subtree keeps
+            signature = self.filter.ignore_signature(rel)
+            signature = list(signature) if signature else None
+            if signature != self._gitignores.get(rel):
+                self.filter.invalidate(rel)
+                forced.add(rel)
+            if signature:
+                self._seen_gitignores[rel] = signature
+        try:
+            subdirs, files = self._list_dir(rel, abs_path)
+        except OSError:
+            return None
+        counters[0] += 1
+        stored_mtime = -1 if mtime_ns >= now_ns - RACY_WINDOW_NS else mtime_ns
+        return [stored_mtime, subdirs, files]
+
+    def _list_dir(self, rel: str, abs_path: str) -> Tuple[List[str], Dict[str, list]]:
+        subdirs: List[str] = []
+        files: Dict[str, list] = {}
+        path_filter = self.filter
+        use_gitignore = path_filter.use_gitignore
+        with os.scandir(abs_path) as it:
+            for entry in it:
+                name = entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if path_filter.keep_dir(rel, name):
+                            subdirs.append(name)
+                        continue
+                    if use_gitignore and path_filter.gitignored(rel, name, False):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # Vanished mid-listing, or a dangling symlink
+                files[name] = [st.st_size, st.st_mtime_ns, st.st_ino]
+        subdirs.sort()
+        return subdirs, dict(sorted(files.items()))
+
+    def _restat(self, rel: str, abs_path: str, record: list, counters: List[int],
+                only: Optional[Set[str]] = None) -> list:
+        """Refresh file signatures in place (only those in `only`, when given)."""
+        prefix = f"{rel}/" if rel else ''
+        files = record[2]
+        vanished = []
+        for name, signature in files.items():
+            if only is not None and prefix + name not in only:
+                continue
+            try:
+                st = os.stat(os.path.join(abs_path, name))
+            except OSError:
+                vanished.append(name)  # Normally moves the dir mtime; a watcher race can land here
+                continue
+            if signature[0] != st.st_size or signature[1] != st.st_mtime_ns or signature[2] != st.st_ino:
+                signature[:] = [st.st_size, st.st_mtime_ns, st.st_ino]
+                counters[1] += 1
+        if not vanished:
+            return record
+        # New record object, so views derived from the old one are rebuilt
+        counters[1] += len(vanished)
+        return [record[0], record[1], {n: s for n, s in files.items() if n not in vanished}]
+
+    def _carry_gitignore(self, rel: str) -> None:
+        """A directory served from the snapshot keeps its recorded .gitignore signature."""
+        if rel in self._gitignores:
+            self._seen_gitignores[rel] = self._gitignores[rel]
+
+    def _edited_gitignores(self) -> Set[str]:
+        """Directories whose recorded .gitignore was edited in place or removed since the snapshot."""
+        forced: Set[str] = set()
+        if not self.filter.use_gitignore:
+            return forced
+        for rel, stored in self._gitignores.items():
+            signature = self.filter.ignore_signature(rel)
+            if (list(signature) if signature else None) != stored:
+                self.filter.invalidate(rel)
+                forced.add(rel)
+        return forced
+
+    # --- Queries (on the last refresh) ---
+
+    def walk(self) -> Iterator[Tuple[int, str, list]]:
+        """(level, rel_dir, record) in os.walk pre-order."""
+        stack = [('', 0)]
+        while stack:
+            rel, level = stack.pop()
+            record = self._tree.get(rel)
+            if record is None:
+                continue
+            yield level, rel, record
+            for name in reversed(record[1]):
+                stack.append((f"{rel}/{name}" if rel else name, level + 1))
+
+    def stat(self, path: str) -> Optional[FileStat]:
+        rel, _, name = path.rpartition('/')
+        record = self._tree.get(rel)
+        signature = record[2].get(name) if record is not None else None
+        return tuple(signature) if signature is not None else None
+
+    def stats(self) -> Dict[str, FileStat]:
+        """Relative file path -> (size, mtime_ns, inode) for every file in the snapshot."""
+        result: Dict[str, FileStat] = {}
+        for rel, (_, _, files) in self._tree.items():
+            prefix = f"{rel}/" if rel else ''
+            for name, signature in files.items():
+                result[prefix + name] = tuple(signature)
+        return result
+
+    @classmethod
+    def shared(cls, root: Union[str, Path], path_filter: Optional[PathFilter] = None,
+               index_file: Optional[Union[str, Path]] = DEFAULT_INDEX_FILE,
+               backend: Optional[str] = None) -> 'FsIndex':
+        """Process-wide instance per (root, ignore config, index file, backend), so views share one snapshot."""
+        path_filter = path_filter or PathFilter(os.path.abspath(str(root)))
+        backend = backend or FS_BACKEND
+        key = (os.path.abspath(str(root)), path_filter.walk_signature, str(index_file), backend)
+        with _SHARED_LOCK:
+            index = _SHARED.get(key)
+            if index is None:
+                index = _SHARED[key] = cls(root, path_filter, index_file, backend=backend)
+            return index
+
+
+_SHARED: Dict[tuple, FsIndex] = {}
+_SHARED_LOCK = threading.Lock()
+
+
+_NO_RECORD = [-1, [], {}]
+
+
+def _overlay(walked: Dict[str, list], tracked: Dict[str, list]) -> Dict[str, list]:
+    """Walked records plus tracked files the walk skipped (e.g. tracked but .gitignore'd)."""
+    merged = dict(walked)
+    for rel, (_, subdirs, files) in tracked.items():
+        record = merged.get(rel)
+        if record is None:
+            merged[rel] = [-1, subdirs, files]
+            continue
+        missing_dirs = [name for name in subdirs if name not in record[1]]
+        missing_files = [name for name in files if name not in record[2]]
+        if missing_dirs or missing_files:
+            # Fresh record objects: the walked snapshot itself stays untouched
+            names = dict(record[2])
+            names.update((name, files[name]) for name in missing_files)
+            merged[rel] = [record[0], sorted(record[1] + missing_dirs), dict(sorted(names.items()))]
+    return merged
+
+
+def _signature_key(root: str, signature: str) -> str:
+    return hashlib.sha1(f"{root}\0{signature}".encode('utf-8')).hexdigest()[:12]
+
+
+def _under_any(rel: str, roots: Set[str]) -> bool:
+    """rel is one of roots or lies below one of them ('' is the tree root)."""
+    if '' in roots or rel in roots:
+        return True
+    return any(rel.startswith(root + '/') for root in roots)
@@ -0,0 +1,198 @@
+"""
+Tracked-File Enumeration from .git/index
+
+Reads the git index (versions 2, 3 and 4) directly, without running git, to
+list tracked files with the stat data git recorded for them. On a checkout
+this replaces a cold directory walk: parsing the index is one sequential
+read, and no untracked or ignored directory is ever visited.
+
+Only the entry table is parsed; extensions (cache tree, untracked cache,
+...) and the trailing checksum are skipped. Entries git does not keep in
+the working tree are dropped: conflict stages other than the first seen,
+skip-worktree (sparse checkout) entries, sparse-index directory entries and
+submodule links. A split index (core.splitIndex, 'link' extension) keeps
+most entries in a shared index file and is rejected, so callers fall back
+to walking the tree.
+"""
+
+import os
+import struct
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Fixed 62-byte entry head; only mtime s/ns, ino, mode, size and flags are unpacked
+# (skipped: ctime s/ns, dev, uid, gid, sha1)
+_ENTRY = struct.Struct('>8xII4xII8xI20xH')
+_HEADER = struct.Struct('>4sII')
+
+_EXTENSION = struct.Struct('>4sI')
+_EXT_LINK = b'link'       # Split index: entries live in .git/sharedindex.<sha>
+_CHECKSUM_SIZE = 20       # SHA-1; the extension scan tolerates longer hashes
+
+_FLAG_EXTENDED = 0x4000
+_XFLAG_SKIP_WORKTREE = 0x4000
+
+_MODE_TYPE = 0o170000
+_MODE_DIR = 0o040000       # Sparse-index directory entry
+_MODE_GITLINK = 0o160000   # Submodule
+
+_ENCODING = 'utf-8'  # Git stores paths as raw bytes; decoded like os.fsdecode on POSIX
+
+# (size, mtime_ns, inode) — same shape as fsindex.FileStat; git stores 32-bit fields
+FileStat = Tuple[int, int, int]
+
+
+class GitIndexError(ValueError):
+    """The index file is missing, truncated or in an unsupported format."""
+
+
+class GitIndexEntry(NamedTuple):
+    path: str       # Relative to the work tree top, '/'-separated
+    mode: int
+    size: int
+    mtime_ns: int
+    ino: int
+
+
+def find_index(root: str) -> Optional[Tuple[str, str]]:
+    """(work tree top, index file) of the checkout containing root, or None outside git."""
+    current = os.path.abspath(root)
+    while True:
+        dot_git = os.path.join(current, '.git')
+        if os.path.isdir(dot_git):
+            return current, os.environ.get('GIT_INDEX_FILE') or os.path.join(dot_git, 'index')
+        if os.path.isfile(dot_git):
+            # Linked worktree or submodule: ".git" is a file pointing at the real git dir
+            try:
+                with open(dot_git, 'r', encoding='utf-8') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if not line.startswith('gitdir:'):
+                return None
+            git_dir = os.path.join(current, line[len('gitdir:'):].strip())
+            return current, os.path.join(os.path.normpath(git_dir), 'index')
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """Git's offset varint (index v4 path prefix lengths) -> (value, next position)."""
+    c = data[pos]
+    pos += 1
+    value = c & 0x7f
+    while c & 0x80:
+        c = data[pos]
+        pos += 1
+        value = ((value + 1) << 7) | (c & 0x7f)
+    return value, pos
+
+
+def parse_index(data: bytes) -> List[GitIndexEntry]:
+    """Entries of a raw index file that exist in the working tree, in index (path) order."""
+    if len(data) < _HEADER.size:
+        raise GitIndexError("index file too short")
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b'DIRC':
+        raise GitIndexError("not a git index (bad signature)")
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"unsupported index version {version}")
+
+    unpack = _ENTRY.unpack_from
+    entries: List[GitIndexEntry] = []
+    pos = _HEADER.size
+    previous = b''
+    last_path = None
+    try:
+        for _ in range(count):
+            start = pos
+            mtime_s, mtime_ns, ino, mode, size, flags = unpack(data, pos)
+            pos += _ENTRY.size
+            skip = False
+            if flags & _FLAG_EXTENDED:
+                if version < 3:
+                    raise GitIndexError("extended entry flags in a version 2 index")
+                skip = bool(struct.unpack_from('>H', data, pos)[0] & _XFLAG_SKIP_WORKTREE)
+                pos += 2
+            if version == 4:
+                strip, pos = _varint(data, pos)
+                end = data.index(b'\0', pos)
+                raw = previous[:len(previous) - strip] + data[pos:end]
+                pos = end + 1
+            else:
+                end = data.index(b'\0', pos)
+                raw = data[pos:end]
+                pos = start + ((end - start + 8) & ~7)  # NUL padding to a multiple of 8
+            previous = raw
+
+            kind = mode & _MODE_TYPE
+            if skip or kind == _MODE_DIR or kind == _MODE_GITLINK:
+                continue
+            path = raw.decode(_ENCODING, 'surrogateescape')
+            if path == last_path:
+                continue  # Further conflict stages of the same path
+            last_path = path
+            entries.append(GitIndexEntry(path, mode, size, mtime_s * 1_000_000_000 + mtime_ns, ino))
+    except (struct.error, ValueError, IndexError) as e:
+        if isinstance(e, GitIndexError):
+            raise
+        raise GitIndexError(f"truncated index entry ({e})") from None
+
+    end = len(data) - _CHECKSUM_SIZE
+    while pos + _EXTENSION.size <= end:
+        extension, size = _EXTENSION.unpack_from(data, pos)
+        if extension == _EXT_LINK:
+            raise GitIndexError("split index (core.splitIndex) is not supported")
+        pos += _EXTENSION.size + size
+    return entries
+
+
+def read_index(index_file: str) -> List[GitIndexEntry]:
+    try:
+        with open(index_file, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        raise GitIndexError(f"cannot read {index_file}: {e}") from None
+    return parse_index(data)
+
+
+# index file -> ((mtime_ns, size), entries); git rewrites the index atomically on every change
+_CACHE: Dict[str, Tuple[Tuple[int, int], List[GitIndexEntry]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def _cached_entries(index_file: str) -> List[GitIndexEntry]:
+    st = os.stat(index_file)
+    key = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(index_file)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+    entries = read_index(index_file)
+    with _CACHE_LOCK:
+        _CACHE[index_file] = (key, entries)
+    return entries
+
+
+def tracked_files(root: str) -> Optional[Dict[str, FileStat]]:
+    """
+    Tracked files below root (paths relative to root) with the stat data in the
+    index, or None when root is not inside a git checkout or the index is unusable.
+    Index stats can be stale for files edited since they were last staged.
+    """
+    located = find_index(root)
+    if located is None:
+        return None
+    top, index_file = located
+    try:
+        entries = _cached_entries(index_file)
+    except (OSError, GitIndexError):
+        return None
+    prefix = os.path.relpath(os.path.abspath(root), top).replace(os.sep, '/')
+    if prefix == '.':
+        return {e.path: (e.size, e.mtime_ns, e.ino) for e in entries}
+    prefix += '/'
+    cut = len(prefix)
+    return {e.path[cut:]: (e.size, e.mtime_ns, e.ino) for e in entries if e.path.startswith(prefix)}
@@ -0,0 +1,188 @@
+"""
+Streaming Lockfile Parser
+
+Extracts the fully resolved dependency set (name, version) from lockfiles
+line by line, so memory stays bounded by the result rather than the file:
+
+    package-lock.json   npm v1 ("dependencies") and v2/v3 ("packages") layouts
+    poetry.lock         [[package]] tables
+    Cargo.lock          [[package]] tables
+    go.sum              module/version/hash lines
+
+Results are cached under CACHE_DIR by content hash (and validated by
+size/mtime first), so unchanged lockfiles are never re-parsed.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from scripts.config import CACHE_DIR
+from scripts.utils import save_cache_quietly
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = CACHE_DIR / 'lockfiles.json'
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# (name, version)
+Dependency = Tuple[str, str]
+
+_TOML_TABLE = re.compile(r'^\s*\[\[?([^\]]+)\]\]?\s*$')
+_TOML_STRING = re.compile(r'^\s*(name|version)\s*=\s*"([^"]*)"')
+
+
+def _parse_package_lock(lines: Iterable[str]) -> Iterator[Dependency]:
+    """
+    npm writes lockfiles pretty-printed (one key per line), so object nesting
+    can be tracked with a stack of open keys instead of materializing the JSON.
+    Plain string tests keep the per-line cost low on multi-megabyte files.
+    """
+    stack: List[str] = []
+    for line in lines:
+        text = line.strip()
+        if text.endswith('{'):
+            # '"key": {' opens a named object; a bare '{' is the root or an array item
+            stack.append(text[1:text.rindex('"', 0, -1)] if text[0] == '"' else '')
+        elif text.startswith('}'):
+            if stack:
+                stack.pop()
+        elif text.startswith('"version"') and stack:
+            version = text.split(':', 1)[1].strip().rstrip(',').strip('"')
+            key = stack[-1]
+            if 'node_modules/' in key:
+                # v2/v3: "packages": {"node_modules/a/node_modules/b": {"version": ...}}
+                yield key.rsplit('node_modules/', 1)[1], version
+            elif key and len(stack) >= 2 and stack[-2] == 'dependencies':
+                # v1: "dependencies": {"b": {"version": ...}} (possibly nested)
+                yield key, version
+
+
+def _parse_toml_packages(lines: Iterable[str]) -> Iterator[Dependency]:
+    """poetry.lock / Cargo.lock: name and version keys of each [[package]] table."""
+    in_package = False
+    name = version = None
+    for line in lines:
+        match = _TOML_TABLE.match(line)
+        if match:
+            if in_package and name and version:
+                yield name, version
+            in_package = match.group(1).strip() == 'package' and line.lstrip().startswith('[[')
+            name = version = None
+            continue
+        if in_package:
+            match = _TOML_STRING.match(line)
+            if match:
+                if match.group(1) == 'name':
+                    name = match.group(2)
+                else:
+                    version = match.group(2)
+    if in_package and name and version:
+        yield name, version
+
+
+def _parse_go_sum(lines: Iterable[str]) -> Iterator[Dependency]:
+    """go.sum: '<module> <version>[/go.mod] <hash>' (two lines per module version)."""
+    for line in lines:
+        parts = line.split()
+        if len(parts) >= 2:
+            yield parts[0], parts[1].split('/', 1)[0]
+
+
+PARSERS: Dict[str, Callable[[Iterable[str]], Iterator[Dependency]]] = {
+    'package-lock.json': _parse_package_lock,
+    'poetry.lock': _parse_toml_packages,
+    'Cargo.lock': _parse_toml_packages,
+    'go.sum': _parse_go_sum,
+}
+
+
+def parse_lockfile(path: Union[str, Path]) -> List[Dependency]:
+    """Resolved (name, version) pairs, de-duplicated and sorted."""
+    parser = PARSERS[os.path.basename(str(path))]
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        first = f.readline()
+        if parser is _parse_package_lock and first.strip() != '{':
+            # Minified lockfile: there are no lines to stream over
+            f.seek(0)
+            return sorted(_walk_package_lock_json(json.load(f)))
+        f.seek(0)
+        return sorted(set(parser(f)))
+
+
+def _walk_package_lock_json(data: dict) -> set:
+    deps = set()
+    for key, info in (data.get('packages') or {}).items():
+        if 'node_modules/' in key and isinstance(info, dict) and info.get('version'):
+            deps.add((key.rsplit('node_modules/', 1)[1], info['version']))
+    stack = [data.get('dependencies') or {}]
+    while stack:
+        for name, info in stack.pop().items():
+            if isinstance(info, dict):
+                if info.get('version'):
+                    deps.add((name, info['version']))
+                stack.append(info.get('dependencies') or {})
+    return deps
+
+
+def _file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LockfileCache:
+    """
+    Parsed lockfiles keyed by content hash.
+
+    files:   path -> [size, mtime_ns, sha1]
+    results: sha1 -> [[name, version], ...]
+    """
+
+    def __init__(self, cache_file: Optional[Union[str, Path]] = DEFAULT_CACHE_FILE):
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.files: Dict[str, list] = {}
+        self.results: Dict[str, list] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == CACHE_VERSION:
+            self.files = data.get('files', {})
+            self.results = data.get('results', {})
+
+    def save(self) -> None:
+        if not self.cache_file or not self._dirty:
+            return
+        # Drop results no tracked lockfile points at any more
+        live = {record[2] for record in self.files.values()}
+        self.results = {sha: deps for sha, deps in self.results.items() if sha in live}
+        payload = {'version': CACHE_VERSION, 'files': self.files, 'results': self.results}
+        if save_cache_quietly(self.cache_file, json.dumps(payload, separators=(',', ':'))):
+            self._dirty = False
+
+    def dependencies(self, path: Union[str, Path]) -> List[Dependency]:
+        """Resolved dependencies of one lockfile (parsed only if its content is new)."""
+        key = os.path.abspath(str(path))
+        st = os.stat(key)
+        record = self.files.get(key)
+        if record and record[0] == st.st_size and record[1] == st.st_mtime_ns and record[2] in self.results:
+            return [tuple(dep) for dep in self.results[record[2]]]
+
+        sha = _file_sha1(key)
+        if sha not in self.results:
+            self.results[sha] = [list(dep) for dep in parse_lockfile(key)]
+        self.files[key] = [st.st_size, st.st_mtime_ns, sha]
+        self._dirty = True
+        return [tuple(dep) for dep in self.results[sha]]
@@ -0,0 +1,296 @@
+"""
+Compiled Path Filters Shared by All Walkers
+
+One PathFilter decides, per directory entry, whether a walker keeps it:
+
+    extensions     suffix hash lookup (set membership on the last suffix)
+    ignore names   exact-name set, plus one regex for names with glob chars
+    .gitignore     each file (nested ones included, plus .git/info/exclude)
+                   compiled into one regex; rule chains are cached per directory
+
+Gitignore semantics follow git: the last matching rule of a file wins, deeper
+files override shallower ones, '!' re-includes, a trailing '/' matches
+directories only, patterns containing '/' are anchored to their file's
+directory, '**' spans directories. Walkers prune ignored directories, so
+(as in git) nothing below an excluded directory can be re-included.
+
+A filter rooted below the directory that owns the rules (a monorepo package)
+inherits the ignore files of every directory above it with inherit_from.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from scripts.config import EXTENSIONS, IGNORE_DIRS, RESPECT_GITIGNORE
+
+GITIGNORE = '.gitignore'
+_GLOB_CHARS = frozenset('*?[')
+
+# (mtime_ns, size) of an ignore file, or None when the directory has none
+IgnoreSignature = Optional[Tuple[int, int]]
+
+
+def _translate(pattern: str) -> str:
+    """Gitignore glob -> regex body matching a path relative to the ignore file's dir."""
+    anchored = '/' in pattern
+    if pattern.startswith('/'):
+        pattern = pattern[1:]
+    out: List[str] = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern.startswith('**', i) and (i == 0 or pattern[i - 1] == '/'):
+                if pattern[i + 2:i + 3] == '/':
+                    out.append('(?:.*/)?')  # '**/': zero or more directories
+                    i += 3
+                    continue
+                if i + 2 == n:
+                    out.append('.*')  # trailing '/**': everything inside
+                    i += 2
+                    continue
+            while i < n and pattern[i] == '*':
+                i += 1
+            out.append('[^/]*')
+            continue
+        if c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', '^') else i + 1)
+            if end < 0:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                negate = body[:1] in ('!', '^')
+                body = body[1:] if negate else body
+                body = body.replace('\\', '\\\\')
+                out.append(f"[^/{body}]" if negate else f"[{body}]")
+                i = end
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    body = ''.join(out)
+    return body if anchored else '(?:.*/)?' + body
+
+
+def _parse_rule(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """One .gitignore line -> (regex body, negate, dir_only), or None for blanks/comments."""
+    line = line.rstrip('\n').rstrip('\r')
+    # Trailing spaces are ignored unless escaped
+    stripped = line.rstrip(' ')
+    if stripped.endswith('\\') and len(stripped) < len(line):
+        stripped += ' '
+    line = stripped
+    if not line or line.startswith('#'):
+        return None
+    negate = line.startswith('!')
+    if negate:
+        line = line[1:]
+    elif line.startswith(('\\#', '\\!')):
+        line = line[1:]
+    dir_only = line.endswith('/')
+    line = line.rstrip('/')
+    if not line:
+        return None
+    return _translate(line), negate, dir_only
+
+
+class IgnoreFile:
+    """
+    Compiled rules of one ignore file; base is its directory relative to the root ('' = root).
+    For an ignore file above the root, prefix is the root's path relative to its directory.
+    """
+
+    def __init__(self, base: str, lines: Iterable[str], prefix: str = ''):
+        self.base = base
+        self.prefix = prefix
+        rules = [rule for rule in map(_parse_rule, lines) if rule is not None]
+        self._any, self._any_negate = self._compile(rules)
+        self._files, self._files_negate = self._compile([r for r in rules if not r[2]])
+
+    @staticmethod
+    def _compile(rules):
+        if not rules:
+            return None, {}
+        # Reversed alternation: the first alternative to match is the LAST rule in the file
+        parts, negate = [], {}
+        for index in range(len(rules) - 1, -1, -1):
+            body, is_negated, _ = rules[index]
+            parts.append(f"(?P<r{index}>{body})")
+            negate[f"r{index}"] = is_negated
+        return re.compile('|'.join(parts), re.DOTALL), negate
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True = ignored, False = re-included by '!', None = no rule matches."""
+        regex, negate = (self._any, self._any_negate) if is_dir else (self._files, self._files_negate)
+        if regex is None:
+            return None
+        m = regex.fullmatch(rel_path)
+        if m is None:
+            return None
+        return not negate[m.lastgroup]
+
+
+def _read_lines(path: str) -> List[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.readlines()
+    except OSError:
+        return []
+
+
+class PathFilter:
+    """Per-entry keep/skip decisions for walkers rooted at `root`."""
+
+    def __init__(self, root: str,
+                 ignore_dirs: Iterable[str] = IGNORE_DIRS,
+                 extensions: Iterable[str] = EXTENSIONS,
+                 use_gitignore: bool = RESPECT_GITIGNORE,
+                 inherit_from: Optional[str] = None):
+        self.root = os.path.abspath(root)
+        self.use_gitignore = use_gitignore
+        names = frozenset(ignore_dirs)
+        self.ignore_names = frozenset(n for n in names if not _GLOB_CHARS.intersection(n))
+        self._globbed_names = sorted(names - self.ignore_names)
+        self._ignore_name_re = (re.compile('|'.join(fnmatch.translate(g) for g in self._globbed_names))
+                                if self._globbed_names else None)
+
+        self.extensions = frozenset(extensions)
+        # Fast path: set lookup on the last '.suffix'; multi-dot or dotless entries use endswith()
+        self._suffixes = frozenset(e for e in self.extensions if e.startswith('.') and e.count('.') == 1)
+        self._slow_suffixes = tuple(sorted(self.extensions - self._suffixes))
+
+        self._rules: Dict[str, Tuple[IgnoreFile, ...]] = {}
+        # Ignore files above the root, deepest first; their text is part of the
+        # signatures, since walkers only track .gitignore files inside the root
+        self._inherited: Tuple[IgnoreFile, ...] = ()
+        self._inherited_text: List[str] = []
+        if use_gitignore and inherit_from:
+            self._inherit(os.path.abspath(inherit_from))
+
+    def _inherit(self, top: str) -> None:
+        rel_root = os.path.relpath(self.root, top)
+        if rel_root == '.' or rel_root.startswith('..'):
+            return
+        parts = rel_root.replace(os.sep, '/').split('/')
+        chain: Tuple[IgnoreFile, ...] = ()
+        for depth in range(len(parts)):
+            ancestor = os.path.join(top, *parts[:depth])
+            prefix = '/'.join(parts[depth:]) + '/'
+            paths = [os.path.join(ancestor, GITIGNORE)]
+            if depth == 0:
+                paths.append(os.path.join(top, '.git', 'info', 'exclude'))
+            own: List[IgnoreFile] = []
+            for path in paths:
+                if os.path.isfile(path):
+                    lines = _read_lines(path)
+                    own.append(IgnoreFile('', lines, prefix))
+                    self._inherited_text.append(prefix + '\0' + ''.join(lines))
+            chain = tuple(reversed(own)) + chain
+        self._inherited = chain
+
+    @property
+    def signature(self) -> str:
+        """Stable key for caches whose contents depend on this filter's configuration."""
+        config = [sorted(self.ignore_names) + self._globbed_names, sorted(self.extensions), self.use_gitignore]
+        if self._inherited_text:
+            config.append(self._inherited_text)
+        return hashlib.sha1(json.dumps(config).encode('utf-8')).hexdigest()
+
+    @property
+    def walk_signature(self) -> str:
+        """Like signature, but ignoring extensions: what decides which entries a full walk keeps."""
+        config = [sorted(self.ignore_names) + self._globbed_names, self.use_gitignore]
+        if self._inherited_text:
+            config.append(self._inherited_text)
+        return hashlib.sha1(json.dumps(config).encode('utf-8')).hexdigest()
+
+    # --- Name-level checks (no directory context needed) ---
+
+    def match_extension(self, name: str) -> bool:
+        dot = name.rfind('.')
+        if dot >= 0 and name[dot:] in self._suffixes:
+            return True
+        return bool(self._slow_suffixes) and name.endswith(self._slow_suffixes)
+
+    def ignored_name(self, name: str) -> bool:
+        if name in self.ignore_names:
+            return True
+        return self._ignore_name_re is not None and self._ignore_name_re.match(name) is not None
+
+    # --- Gitignore rules ---
+
+    def ignore_signature(self, rel_dir: str) -> IgnoreSignature:
+        """Stat signature of the .gitignore in rel_dir (None if absent)."""
+        path = os.path.join(self.root, rel_dir, GITIGNORE) if rel_dir else os.path.join(self.root, GITIGNORE)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def rules(self, rel_dir: str) -> Tuple[IgnoreFile, ...]:
+        """Ignore files that apply inside rel_dir, deepest first (cached per directory)."""
+        chain = self._rules.get(rel_dir)
+        if chain is not None:
+            return chain
+        if not self.use_gitignore:
+            chain = ()
+        else:
+            parent = self.rules(rel_dir.rpartition('/')[0]) if rel_dir else self._inherited
+            own: List[IgnoreFile] = []
+            if self.ignore_signature(rel_dir) is not None:
+                abs_dir = os.path.join(self.root, rel_dir) if rel_dir else self.root
+                own.append(IgnoreFile(rel_dir, _read_lines(os.path.join(abs_dir, GITIGNORE))))
+            if not rel_dir:
+                exclude = os.path.join(self.root, '.git', 'info', 'exclude')
+                if os.path.isfile(exclude):
+                    own.append(IgnoreFile('', _read_lines(exclude)))
+            chain = tuple(reversed(own)) + parent
+        self._rules[rel_dir] = chain
+        return chain
+
+    def invalidate(self, rel_dir: str = '') -> None:
+        """Forget cached rules for rel_dir and everything below it (a .gitignore changed)."""
+        if not rel_dir:
+            self._rules.clear()
+            return
+        prefix = rel_dir + '/'
+        for key in [k for k in list(self._rules) if k == rel_dir or k.startswith(prefix)]:
+            del self._rules[key]
+
+    def gitignored(self, rel_dir: str, name: str, is_dir: bool) -> bool:
+        for ignore_file in self.rules(rel_dir):
+            base = ignore_file.base
+            if not base:
+                prefix = ignore_file.prefix
+                rel_path = f"{prefix}{rel_dir}/{name}" if rel_dir else prefix + name
+            elif rel_dir == base:
+                rel_path = name
+            else:
+                rel_path = f"{rel_dir[len(base) + 1:]}/{name}"
+            verdict = ignore_file.match(rel_path, is_dir)
+            if verdict is not None:
+                return verdict
+        return False
+
+    # --- Walker entry points ---
+
+    def keep_dir(self, rel_dir: str, name: str) -> bool:
+        """Descend into rel_dir/name?"""
+        if self.ignored_name(name):
+            return False
+        return not (self.use_gitignore and self.gitignored(rel_dir, name, True))
+
+    def keep_file(self, rel_dir: str, name: str, check_extension: bool = True) -> bool:
+        """List rel_dir/name? (check_extension=False for manifests matched by name)"""
+        if check_extension and not self.match_extension(name):
+            return False
+        return not (self.use_gitignore and self.gitignored(rel_dir, name, False))
@@ -0,0 +1,111 @@
+"""
+Token-Budgeted Prompt Assembly
+
+Fits the context layers of a make_prompt prompt into a token budget.
+Each layer has a priority and a list of renderings from most to least
+detailed; layers are filled greedily in priority order, each taking the
+richest rendering that still fits, so oversized context degrades step by
+step instead of being cut off wholesale.
+"""
+
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# CJK ideographs/kana/hangul tokenize at roughly one token per character;
+# everything else averages ~4 characters per token on BPE tokenizers.
+_WIDE_CHARS = re.compile(r'[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]')
+_FENCED_BLOCK = re.compile(r'^```.*?^```[ \t]*\n?', re.MULTILINE | re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """Fast tokenizer-free estimate (within ~10-15% of BPE counts for code/prose)."""
+    if not text:
+        return 0
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + (len(text) - wide + 3) // 4
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Longest prefix of text within budget, cut at a line end when one is near the limit."""
+    max_chars = budget * 4
+    while max_chars > 0:
+        cut = text[:max_chars]
+        newline = cut.rfind('\n')
+        if newline >= len(cut) // 2:
+            cut = cut[:newline + 1]
+        if estimate_tokens(cut) <= budget:
+            return cut
+        max_chars = int(max_chars * 0.9)
+    return ''
+
+
+def fit_records(preamble: str, records: Sequence[str], budget: int) -> Tuple[str, int, bool]:
+    """
+    Keep the preamble (truncated if it alone exceeds the budget) and as many
+    records as fit, in the given priority order.
+    Returns (text, omitted_count, preamble_truncated).
+    """
+    truncated = estimate_tokens(preamble) > budget
+    if truncated:
+        preamble = truncate_to_tokens(preamble, budget)
+    parts = [preamble] if preamble else []
+    used = estimate_tokens(preamble)
+    omitted = 0
+    for record in records:
+        cost = estimate_tokens(record) + 1
+        if used + cost <= budget:
+            parts.append(record)
+            used += cost
+        else:
+            omitted += 1
+    return '\n'.join(p.rstrip('\n') for p in parts) + '\n', omitted, truncated
+
+
+def status_variants(status: str) -> List[Tuple[str, str]]:
+    """status.md renderings: full, then without fenced blocks (the tree is sent separately)."""
+    variants = [('full', status)]
+    stripped = _FENCED_BLOCK.sub('', status)
+    if stripped != status:
+        variants.append(('without structure blocks', stripped))
+    return variants
+
+
+class Layer:
+    """
+    One prompt section competing for the budget.
+    variants: [(label, text), ...] most detailed first; and/or a `fill(budget)`
+    callable returning (text, note), used when no variant fits (layers that
+    degrade record-by-record or search for a fitting rendering).
+    """
+
+    def __init__(self, name: str, priority: int,
+                 variants: Sequence[Tuple[str, str]] = (),
+                 fill: Optional[Callable[[int], Tuple[str, Optional[str]]]] = None):
+        self.name = name
+        self.priority = priority
+        self.variants = list(variants)
+        self.fill = fill
+
+
+def allocate(layers: Sequence[Layer], budget: int) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Greedy fill in priority order (lower number = more important).
+    Returns ({layer_name: text}, [degradation notes]).
+    """
+    remaining = budget
+    chosen: Dict[str, str] = {}
+    notes: List[str] = []
+
+    for layer in sorted(layers, key=lambda l: l.priority):
+        text, note = None, 'omitted'
+        for index, (label, candidate) in enumerate(layer.variants):
+            if estimate_tokens(candidate) <= remaining:
+                text, note = candidate, (None if index == 0 else label)
+                break
+        if text is None:
+            text, note = layer.fill(max(remaining, 0)) if layer.fill is not None else ('', note)
+        remaining -= estimate_tokens(text)
+        chosen[layer.name] = text
+        if note:
+            notes.append(f"{layer.name}: {note}")
+    return chosen, notes
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Indexed Registry Queries over AGENTS_INDEX.yaml
+
+Builds hash indexes once over the compiled registry (see config.load_index):
+name -> entries, tag -> entries, section -> entries, path -> entry. Lookups
+are dictionary hits; multi-tag queries intersect the per-tag id sets,
+smallest first, so cost follows the rarest tag rather than the registry size.
+
+Names and tags are matched case-insensitively; paths are normalized the way
+CORE_FILES always has been (forward slashes, no leading './').
+
+Usage:
+    python scripts/registry.py --tag python --tag gui --section frameworks
+    python scripts/registry.py --name "Node.js"
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+if __name__ == '__main__':
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.config import load_index  # noqa: E402
+
+
+class RegistryEntry(NamedTuple):
+    section: str
+    name: str
+    path: str
+    tags: Tuple[str, ...]
+    description: str
+
+
+def normalize_path(path: str) -> str:
+    path = path.replace('\\', '/')
+    return path[2:] if path.startswith('./') else path
+
+
+def _key(text: str) -> str:
+    return text.strip().lower()
+
+
+class Registry:
+    """Read-only registry with prebuilt name/tag/section/path indexes."""
+
+    def __init__(self, registry: Mapping[str, Any]):
+        self.entries: List[RegistryEntry] = []
+        self._by_name: Dict[str, List[int]] = {}
+        self._by_tag: Dict[str, FrozenSet[int]] = {}
+        self._by_section: Dict[str, FrozenSet[int]] = {}
+        self._by_path: Dict[str, int] = {}
+
+        tags: Dict[str, set] = {}
+        sections: Dict[str, set] = {}
+        for section, items in (registry or {}).items():
+            ids = sections.setdefault(_key(section), set())
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict) or 'path' not in item:
+                    continue
+                raw_tags = item.get('tags') or ()
+                if isinstance(raw_tags, str):
+                    raw_tags = (raw_tags,)
+                entry = RegistryEntry(
+                    section=section,
+                    name=str(item.get('name') or ''),
+                    path=normalize_path(str(item['path'])),
+                    tags=tuple(str(t) for t in raw_tags),
+                    description=str(item.get('description') or ''),
+                )
+                index = len(self.entries)
+                self.entries.append(entry)
+                ids.add(index)
+                if entry.name:
+                    self._by_name.setdefault(_key(entry.name), []).append(index)
+                for tag in entry.tags:
+                    tags.setdefault(_key(tag), set()).add(index)
+                self._by_path.setdefault(entry.path, index)  # First registration wins
+        self._by_tag = {tag: frozenset(ids) for tag, ids in tags.items()}
+        self._by_section = {section: frozenset(ids) for section, ids in sections.items()}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[RegistryEntry]:
+        return iter(self.entries)
+
+    def sections(self) -> List[str]:
+        return sorted(self._by_section)
+
+    def tags(self) -> List[str]:
+        return sorted(self._by_tag)
+
+    def get(self, name: str, section: Optional[str] = None) -> Optional[RegistryEntry]:
+        """Entry by name (first registered one, or the one in `section`)."""
+        for index in self._by_name.get(_key(name), ()):
+            if section is None or _key(self.entries[index].section) == _key(section):
+                return self.entries[index]
+        return None
+
+    def by_path(self, path: str) -> Optional[RegistryEntry]:
+        index = self._by_path.get(normalize_path(path))
+        return None if index is None else self.entries[index]
+
+    def section(self, section: str) -> List[RegistryEntry]:
+        return self._select([self._by_section.get(_key(section), frozenset())])
+
+    def tagged(self, *tags: str, section: Optional[str] = None) -> List[RegistryEntry]:
+        """Entries carrying ALL of the given tags (optionally within one section)."""
+        sets = [self._by_tag.get(_key(tag), frozenset()) for tag in tags]
+        if section is not None:
+            sets.append(self._by_section.get(_key(section), frozenset()))
+        return self._select(sets)
+
+    def paths(self) -> List[str]:
+        return list(self._by_path)
+
+    def _select(self, sets: List[FrozenSet[int]]) -> List[RegistryEntry]:
+        """Intersect id sets smallest first; results keep registry order."""
+        if not sets:
+            return list(self.entries)
+        sets = sorted(sets, key=len)
+        ids = set(sets[0])
+        for other in sets[1:]:
+            if not ids:
+                break
+            ids &= other
+        return [self.entries[i] for i in sorted(ids)]
+
+
+_REGISTRY: Optional[Registry] = None
+
+
+def load_registry() -> Registry:
+    """Process-wide Registry built from the compiled AGENTS_INDEX.yaml cache."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        _REGISTRY = Registry(load_index().get('registry') or {})
+    return _REGISTRY
+
+
+def _print_entries(entries: Iterable[RegistryEntry]) -> None:
+    for entry in entries:
+        tags = f"  [{', '.join(entry.tags)}]" if entry.tags else ""
+        print(f"{entry.section:<12} {entry.name or '-':<28} {entry.path}{tags}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the AGENTS_INDEX.yaml registry.")
+    parser.add_argument('--name', help="Look up one entry by name")
+    parser.add_argument('--tag', action='append', default=[], help="Require a tag (repeatable: intersection)")
+    parser.add_argument('--section', help="Restrict to one registry section")
+    parser.add_argument('--list-tags', action='store_true', help="List known tags")
+    args = parser.parse_args()
+
+    registry = load_registry()
+    if args.list_tags:
+        print('\n'.join(registry.tags()))
+    elif args.name:
+        entry = registry.get(args.name, args.section)
+        if entry is None:
+            print(f"No registry entry named {args.name!r}", file=sys.stderr)
+            sys.exit(1)
+        _print_entries([entry])
+    elif args.tag:
+        _print_entries(registry.tagged(*args.tag, section=args.section))
+    elif args.section:
+        _print_entries(registry.section(args.section))
+    else:
+        _print_entries(registry)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Local BM25 Snippet Index
+
+Persistent inverted index over project source files (filtered by
+EXTENSIONS / IGNORE_DIRS) used by make_prompt to inject query-relevant
+snippets. Files are split into fixed line windows ("chunks"); each chunk
+is a BM25 document. Updates are incremental: unchanged files are skipped
+by (size, mtime), touched-but-identical files by content hash.
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import pickle
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from scripts.config import CACHE_DIR, PROJECT_ROOT
+from scripts.fsindex import FileStat
+from scripts.tree_cache import TreeCache
+from scripts.utils import save_cache_quietly
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_FILE = CACHE_DIR / 'search_index.pickle'
+
+CHUNK_LINES = 40                    # Lines per indexed snippet window
+MAX_INDEX_FILE_BYTES = 1024 * 1024  # Larger files (logs, data dumps) are not indexed
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*|\d+|[\u4e00-\u9fff]')
+_CAMEL = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+_BACKTICK_RUN = re.compile(r'`+')
+
+# (score, path, start_line, end_line) — lines are 1-based and inclusive
+SearchHit = Tuple[float, str, int, int]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased identifiers plus their snake_case / camelCase parts."""
+    tokens = []
+    for raw in _TOKEN.findall(text):
+        lower = raw.lower()
+        tokens.append(lower)
+        if len(raw) > 3 and ('_' in raw or not raw.islower()):
+            parts = [p.lower() for p in _CAMEL.findall(raw)]
+            if len(parts) > 1:
+                tokens.extend(parts)
+    return tokens
+
+
+class SearchIndex:
+    """
+    Incrementally maintained BM25 index.
+
+    files:    path -> (size, mtime_ns, sha1, [chunk_id, ...])
+    chunks:   chunk_id -> (path, start_line, end_line, length, {term: tf})
+    postings: term -> {chunk_id: tf}
+    """
+
+    def __init__(self, root: Union[str, Path] = PROJECT_ROOT,
+                 index_file: Optional[Union[str, Path]] = DEFAULT_INDEX_FILE):
+        self.root = str(root)
+        self.index_file = Path(index_file) if index_file else None
+        self.files: Dict[str, tuple] = {}
+        self.chunks: Dict[int, tuple] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_length = 0
+        self._next_id = 0
+        self._dirty = False
+
+    # --- Persistence ---
+
+    @classmethod
+    def open(cls, root: Union[str, Path] = PROJECT_ROOT,
+             index_file: Optional[Union[str, Path]] = DEFAULT_INDEX_FILE) -> 'SearchIndex':
+        index = cls(root, index_file)
+        if index.index_file and index.index_file.exists():
+            try:
+                with open(index.index_file, 'rb') as f:
+                    state = pickle.load(f)
+                if state.get('version') == INDEX_VERSION and state.get('root') == os.path.abspath(index.root):
+                    index.files = state['files']
+                    index.chunks = state['chunks']
+                    index.postings = state['postings']
+                    index.total_length = state['total_length']
+                    index._next_id = state['next_id']
+            except Exception:
+                pass  # Corrupt or incompatible cache: rebuild from scratch
+        return index
+
+    def save(self) -> None:
+        if not self.index_file or not self._dirty:
+            return
+        state = {
+            'version': INDEX_VERSION,
+            'root': os.path.abspath(self.root),
+            'files': self.files,
+            'chunks': self.chunks,
+            'postings': self.postings,
+            'total_length': self.total_length,
+            'next_id': self._next_id,
+        }
+        if save_cache_quietly(self.index_file, pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)):
+            self._dirty = False
+
+    # --- Maintenance ---
+
+    def _remove_file(self, path: str) -> bool:
+        record = self.files.pop(path, None)
+        if record is None:
+            return False
+        for chunk_id in record[3]:
+            _, _, _, length, terms = self.chunks.pop(chunk_id)
+            self.total_length -= length
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(chunk_id, None)
+                    if not posting:
+                        del self.postings[term]
+        self._dirty = True
+        return True
+
+    def _add_file(self, path: str, text: str, signature: tuple) -> None:
+        lines = text.splitlines()
+        chunk_ids = []
+        for start in range(0, max(len(lines), 1), CHUNK_LINES):
+            window = lines[start:start + CHUNK_LINES]
+            tokens = tokenize('\n'.join(window))
+            if start == 0:
+                tokens += tokenize(path)  # File names are strong relevance signals
+            if not tokens:
+                continue
+            terms = Counter(tokens)
+            chunk_id = self._next_id
+            self._next_id += 1
+            self.chunks[chunk_id] = (path, start + 1, start + len(window), len(tokens), dict(terms))
+            self.total_length += len(tokens)
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[chunk_id] = tf
+            chunk_ids.append(chunk_id)
+        self.files[path] = signature + (chunk_ids,)
+        self._dirty = True
+
+    def update(self, paths: Optional[Iterable[str]] = None) -> int:
+        """
+        Bring the index in line with the working tree. Returns the number of files
+        re-indexed or removed (0 = nothing changed).
+        paths: relative file list to index (default: current TreeCache listing of root).
+        """
+        stats: Dict[str, FileStat] = {}
+        if paths is None:
+            tree = TreeCache(self.root)
+            tree.scan(restat=True)
+            paths = tree.files()
+            stats = tree.stats()  # Signatures from the shared snapshot: no second stat() pass
+        current = set(paths)
+
+        changed = 0
+        for stale in [p for p in self.files if p not in current]:
+            changed += self._remove_file(stale)
+
+        for path in current:
+            abs_path = os.path.join(self.root, path)
+            signature = stats.get(path)
+            if signature is None:
+                try:
+                    st = os.stat(abs_path)
+                except OSError:
+                    changed += self._remove_file(path)
+                    continue
+                signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+            size, mtime_ns = signature[0], signature[1]
+            record = self.files.get(path)
+            if record is not None and record[0] == size and record[1] == mtime_ns:
+                continue
+            if size > MAX_INDEX_FILE_BYTES:
+                changed += self._remove_file(path)
+                continue
+            try:
+                with open(abs_path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            digest = hashlib.sha1(data).hexdigest()
+            if record is not None and record[2] == digest:
+                # Touched but identical: refresh the stat signature only
+                self.files[path] = (size, mtime_ns, digest, record[3])
+                self._dirty = True
+                continue
+            removed = self._remove_file(path)
+            if b'\0' in data[:8192]:
+                changed += removed
+                continue  # Binary content
+            self._add_file(path, data.decode('utf-8', errors='ignore'), (size, mtime_ns, digest))
+            changed += 1
+        return changed
+
+    # --- Query ---
+
+    def search(self, query: str, top_k: int = 3, per_file: int = 1) -> List[SearchHit]:
+        """BM25-rank chunks for `query`; at most `per_file` hits per file."""
+        n_docs = len(self.chunks)
+        if not n_docs or top_k <= 0:
+            return []
+        avg_len = self.total_length / n_docs
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for chunk_id, tf in posting.items():
+                length = self.chunks[chunk_id][3]
+                norm = tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len))
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * norm
+
+        hits: List[SearchHit] = []
+        taken: Counter = Counter()
+        for chunk_id, score in heapq.nlargest(top_k * 4 * per_file, scores.items(), key=lambda kv: kv[1]):
+            path, start, end, _, _ = self.chunks[chunk_id]
+            if taken[path] >= per_file:
+                continue
+            taken[path] += 1
+            hits.append((score, path, start, end))
+            if len(hits) >= top_k:
+                break
+        return hits
+
+    def snippet(self, hit: SearchHit) -> str:
+        """Render a hit as a fenced Markdown snippet (read fresh from disk)."""
+        score, path, start, end = hit
+        try:
+            with open(os.path.join(self.root, path), 'r', encoding='utf-8', errors='ignore') as f:
+                lines = f.read().splitlines()[start - 1:end]
+        except OSError:
+            return ''
+        lang = os.path.splitext(path)[1].lstrip('.')
+        body = '\n'.join(lines)
+        # Fence must outlast any backtick run in the body (e.g. a Markdown file's own ``` blocks)
+        fence = '`' * max(3, max(map(len, _BACKTICK_RUN.findall(body)), default=0) + 1)
+        return f"### {path} (lines {start}-{end}, score {score:.2f})\n{fence}{lang}\n{body}\n{fence}\n"
@@ -0,0 +1,158 @@
+"""
+Persistent File Manifest for auto_status
+
+Records, per matched file, the stat signature (size, mtime, inode) and the
+last counted number of non-blank lines. A warm run only re-reads files
+whose signature moved; project totals are rebuilt from the manifest.
+Files above the large-file threshold follow the configured size policy
+(sampled estimate with error bound, or skipped and flagged).
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+from scripts.config import CACHE_DIR, LARGE_FILE_BYTES, LARGE_FILE_POLICY, RACY_WINDOW_NS
+from scripts.fsindex import FileStat
+from scripts.linecount import SKIPPED, count_files
+from scripts.utils import save_cache_quietly
+
+MANIFEST_VERSION = 2
+DEFAULT_MANIFEST_FILE = 'auto'  # One file per root under CACHE_DIR
+
+# path -> [size, mtime_ns, inode, non_blank_lines, error]
+# error: 0 = exact count, > 0 = sampled estimate ± error, linecount.SKIPPED = not read
+FileRecord = list
+
+# (path, size, lines, error) for files at or above the large-file threshold
+LargeFile = Tuple[str, int, int, int]
+
+
+class StatusManifest:
+    """Stat-validated line counts for the files of one project root."""
+
+    def __init__(self, root: Union[str, Path],
+                 manifest_file: Optional[Union[str, Path]] = DEFAULT_MANIFEST_FILE,
+                 large_bytes: Optional[int] = LARGE_FILE_BYTES,
+                 large_policy: str = LARGE_FILE_POLICY):
+        self.root = str(root)
+        self.large_bytes = large_bytes
+        self.large_policy = large_policy
+        if manifest_file == 'auto':
+            key = hashlib.sha1(os.path.abspath(self.root).encode('utf-8')).hexdigest()[:12]
+            manifest_file = CACHE_DIR / f"status_manifest-{key}.json"
+        self.manifest_file = Path(manifest_file) if manifest_file else None
+        self.files: Dict[str, FileRecord] = {}
+        self.recounted = 0  # Files re-read during the last update()
+        self._loaded = False
+        self._dirty = False
+
+    def load(self) -> None:
+        """Load the persisted manifest (silently starts empty if missing/stale)."""
+        self._loaded = True
+        if not self.manifest_file or not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == MANIFEST_VERSION and data.get('root') == os.path.abspath(self.root):
+            self.files = data.get('files', {})
+
+    def save(self) -> None:
+        if not self.manifest_file or not self._dirty:
+            return
+        payload = {'version': MANIFEST_VERSION, 'root': os.path.abspath(self.root), 'files': self.files}
+        if save_cache_quietly(self.manifest_file, json.dumps(payload, separators=(',', ':'))):
+            self._dirty = False
+
+    def update(self, paths: Iterable[str],
+               on_error: Optional[Callable[[str, Exception], None]] = None,
+               workers: Optional[int] = None,
+               changed: Optional[Set[str]] = None,
+               stats: Optional[Mapping[str, FileStat]] = None) -> int:
+        """
+        Sync the manifest with the given relative file paths. Returns recounted file count.
+        Only new files and files whose signature moved are read (as one counting batch).
+
+        changed: relative paths a filesystem watcher reported. When given, only those
+                 and files new to the manifest are stat()ed; all others are trusted.
+        stats:   (size, mtime_ns, inode) per path from a fresh FsIndex refresh; paths
+                 found there are not stat()ed again.
+        """
+        if not self._loaded:
+            self.load()
+
+        now_ns = time.time_ns()
+        current = set(paths)
+        for stale in [p for p in self.files if p not in current]:
+            del self.files[stale]
+            self._dirty = True
+
+        stale: Dict[str, FileStat] = {}
+        for path in current:
+            if changed is not None and path not in changed and path in self.files:
+                continue
+            signature = stats.get(path) if stats is not None else None
+            if signature is None:
+                try:
+                    st = os.stat(os.path.join(self.root, path))
+                except OSError:
+                    if self.files.pop(path, None) is not None:
+                        self._dirty = True  # Vanished since the tree was listed
+                    continue
+                signature = (st.st_size, st.st_mtime_ns, st.st_ino)
+            record = self.files.get(path)
+            if (record is None or record[0] != signature[0] or record[1] != signature[1]
+                    or record[2] != signature[2] or not self._policy_matches(record)):
+                stale[path] = signature
+
+        counts = count_files({os.path.join(self.root, p): sig[0] for p, sig in stale.items()},
+                             workers, self.large_bytes, self.large_policy)
+        for path, (size, mtime_ns, ino) in stale.items():
+            abs_path = os.path.join(self.root, path)
+            result = counts[abs_path]
+            # A file written within the racy window could change again without moving its mtime
+            if mtime_ns >= now_ns - RACY_WINDOW_NS:
+                mtime_ns = -1
+            if isinstance(result, Exception):
+                if on_error is not None:
+                    on_error(abs_path, result)
+                result, mtime_ns = (0, 0), -1  # Still counted as a file; retried next run
+            lines, error = result
+            self.files[path] = [size, mtime_ns, ino, lines, error]
+            self._dirty = True
+        self.recounted = len(stale)
+        return self.recounted
+
+    def _is_large(self, size: int) -> bool:
+        return self.large_bytes is not None and size >= self.large_bytes
+
+    def _policy_matches(self, record: FileRecord) -> bool:
+        """Whether a record was measured the way the current size policy would measure it."""
+        size, error = record[0], record[4]
+        if not self._is_large(size) or self.large_policy == 'count':
+            return error == 0
+        if self.large_policy == 'skip':
+            return error == SKIPPED
+        return error != SKIPPED
+
+    def large_files(self) -> List[LargeFile]:
+        """Files at or above the large-file threshold, biggest first."""
+        large = [(path, record[0], record[3], record[4])
+                 for path, record in self.files.items() if self._is_large(record[0])]
+        return sorted(large, key=lambda item: (-item[1], item[0]))
+
+    def line_counts(self) -> Dict[str, int]:
+        """{relative path: non-blank lines} (estimates for sampled files)."""
+        if not self._loaded:
+            self.load()
+        return {path: record[3] for path, record in self.files.items()}
+
+    def totals(self) -> Tuple[int, int]:
+        """(file_count, non_blank_line_count) over all files in the manifest."""
+        return len(self.files), sum(record[3] for record in self.files.values())
@@ -0,0 +1,160 @@
+"""
+Status Snapshots and Run-to-Run Diffs
+
+Each auto_status run records a compact JSON snapshot of what it measured:
+per-file non-blank line counts (taken straight from the status manifests,
+so nothing is re-read) and the resolved lockfile dependencies. Comparing
+two snapshots yields a small change report (files added/removed, line
+deltas per directory, dependency changes) that can be handed to an agent
+instead of the full status file.
+"""
+
+import datetime
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
+
+from scripts.config import CACHE_DIR
+from scripts.utils import save_cache_quietly
+
+SNAPSHOT_VERSION = 1
+DEFAULT_SNAPSHOT_FILE = CACHE_DIR / 'status_snapshot.json'
+DIFF_DIR_DEPTH = 2     # Line deltas are grouped by directory down to this depth
+MAX_LISTED = 20        # Per-section cap in the rendered report
+
+# {"created": iso time, "root": abs path, "files": {path: lines}, "dependencies": {lockfile: {name: versions}}}
+Snapshot = dict
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[Tuple[str, int]]                 # (path, lines)
+    removed: List[Tuple[str, int]]
+    directories: List[Tuple[str, int, int]]      # (directory, file delta, line delta)
+    deps_added: List[Tuple[str, str, str]]       # (lockfile, name, versions)
+    deps_removed: List[Tuple[str, str, str]]
+    deps_changed: List[Tuple[str, str, str, str]]  # (lockfile, name, old, new)
+
+    def is_empty(self) -> bool:
+        return not any(self)
+
+
+def take_snapshot(root: Union[str, Path], files: Mapping[str, int],
+                  lock_deps: Mapping[str, Sequence[Tuple[str, str]]]) -> Snapshot:
+    """Build a snapshot from manifest line counts and resolved lockfile dependencies."""
+    dependencies: Dict[str, Dict[str, str]] = {}
+    for lockfile, deps in lock_deps.items():
+        versions: Dict[str, List[str]] = {}
+        for name, version in deps:
+            versions.setdefault(name, []).append(version)
+        dependencies[lockfile] = {name: ', '.join(sorted(v)) for name, v in versions.items()}
+    return {
+        'version': SNAPSHOT_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'root': os.path.abspath(str(root)),
+        'files': dict(files),
+        'dependencies': dependencies,
+    }
+
+
+def load_snapshot(root: Union[str, Path],
+                  snapshot_file: Union[str, Path] = DEFAULT_SNAPSHOT_FILE) -> Optional[Snapshot]:
+    """The previous snapshot for this root, or None if missing/unreadable/stale format."""
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != SNAPSHOT_VERSION or data.get('root') != os.path.abspath(str(root)):
+        return None
+    return data
+
+
+def save_snapshot(snapshot: Snapshot, snapshot_file: Union[str, Path] = DEFAULT_SNAPSHOT_FILE) -> None:
+    save_cache_quietly(snapshot_file, json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')))
+
+
+def _directory(path: str, depth: int) -> str:
+    parts = path.split('/')[:-1]
+    return '/'.join(parts[:depth]) or '.'
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot, depth: int = DIFF_DIR_DEPTH) -> SnapshotDiff:
+    old_files, new_files = old.get('files', {}), new.get('files', {})
+    added = sorted((p, n) for p, n in new_files.items() if p not in old_files)
+    removed = sorted((p, n) for p, n in old_files.items() if p not in new_files)
+
+    # Only paths present on either side with a different count contribute
+    deltas: Dict[str, List[int]] = {}
+    for path, lines in new_files.items():
+        before = old_files.get(path)
+        if before != lines:
+            entry = deltas.setdefault(_directory(path, depth), [0, 0])
+            entry[0] += before is None
+            entry[1] += lines - (before or 0)
+    for path, lines in removed:
+        entry = deltas.setdefault(_directory(path, depth), [0, 0])
+        entry[0] -= 1
+        entry[1] -= lines
+    directories = sorted(((d, f, l) for d, (f, l) in deltas.items() if f or l),
+                         key=lambda item: (-abs(item[2]), item[0]))
+
+    deps_added, deps_removed, deps_changed = [], [], []
+    old_deps, new_deps = old.get('dependencies', {}), new.get('dependencies', {})
+    for lockfile in sorted(set(old_deps) | set(new_deps)):
+        before, after = old_deps.get(lockfile, {}), new_deps.get(lockfile, {})
+        for name in sorted(set(before) | set(after)):
+            if name not in before:
+                deps_added.append((lockfile, name, after[name]))
+            elif name not in after:
+                deps_removed.append((lockfile, name, before[name]))
+            elif before[name] != after[name]:
+                deps_changed.append((lockfile, name, before[name], after[name]))
+    return SnapshotDiff(added, removed, directories, deps_added, deps_removed, deps_changed)
+
+
+def _listed(items: List[str]) -> List[str]:
+    if len(items) <= MAX_LISTED:
+        return items
+    return items[:MAX_LISTED] + [f"- ... and {len(items) - MAX_LISTED} more"]
+
+
+def render_diff(diff: Optional[SnapshotDiff], since: Optional[str] = None) -> str:
+    """Markdown change report (diff is None when there was no previous snapshot)."""
+    lines = ["# Status Diff", ""]
+    if diff is None:
+        lines.append("_No previous snapshot: baseline recorded, run again to see changes._")
+        return '\n'.join(lines) + '\n'
+    lines.append(f"_Changes since {since or 'the previous run'}_")
+    lines.append("")
+    if diff.is_empty():
+        lines.append("No changes.")
+        return '\n'.join(lines) + '\n'
+
+    net = sum(delta for _, _, delta in diff.directories)  # Covers added, removed and edited files
+    lines.append(f"**Files**: +{len(diff.added)} / -{len(diff.removed)}, **Lines**: {net:+,}")
+    lines.append("")
+    if diff.added:
+        lines.append("### Added Files")
+        lines += _listed([f"- `{p}` ({n:,} lines)" for p, n in diff.added])
+        lines.append("")
+    if diff.removed:
+        lines.append("### Removed Files")
+        lines += _listed([f"- `{p}` ({n:,} lines)" for p, n in diff.removed])
+        lines.append("")
+    if diff.directories:
+        lines.append(f"### Line Deltas by Directory (Depth: {DIFF_DIR_DEPTH})")
+        lines.append("| Directory | Files | Lines |")
+        lines.append("|---|---|---|")
+        rows = [f"| `{d}` | {f:+d} | {l:+,} |" for d, f, l in diff.directories]
+        if len(rows) > MAX_LISTED:
+            rows = rows[:MAX_LISTED] + [f"| ... {len(rows) - MAX_LISTED} more | | |"]
+        lines += rows
+        lines.append("")
+    if diff.deps_added or diff.deps_removed or diff.deps_changed:
+        lines.append("### Dependency Changes")
+        lines += _listed([f"- `{lock}`: added `{name}@{v}`" for lock, name, v in diff.deps_added])
+        lines += _listed([f"- `{lock}`: removed `{name}@{v}`" for lock, name, v in diff.deps_removed])
+        lines += _listed([f"- `{lock}`: `{name}` {a} → {b}" for lock, name, a, b in diff.deps_changed])
+        lines.append("")
+    return '\n'.join(lines)
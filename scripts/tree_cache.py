@@ -0,0 +1,132 @@
+"""
+Persistent Incremental Tree Cache
+
+Extension/manifest view over the shared filesystem snapshot (scripts.fsindex).
+A directory's mtime only moves when entries are added, removed or renamed
+inside it, so an unchanged tree costs one stat() per directory instead of a
+full os.walk listing — and every tool built on TreeCache shares that one
+snapshot instead of walking the tree itself.
+"""
+
+import fnmatch
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from scripts.config import EXTENSIONS, IGNORE_DIRS
+from scripts.fsindex import DEFAULT_INDEX_FILE, FileStat, FsIndex
+from scripts.pathfilter import PathFilter
+
+DEFAULT_CACHE_FILE = DEFAULT_INDEX_FILE
+
+# (level, basename, matched_files) — same shape make_prompt has always used
+TreeEntry = Tuple[int, str, List[str]]
+
+
+class TreeCache:
+    """
+    Incremental, mtime-validated directory tree scanner.
+
+    Lists come from the process-wide FsIndex for (root, ignore config,
+    cache_file); this class only selects, per directory, the files matching
+    its extensions and manifest_patterns (memoized per snapshot record).
+
+    manifest_patterns: glob patterns (e.g. 'package.json', '*.csproj') for files
+    collected regardless of extension; see manifests().
+
+    cache_file: 'auto' (shared snapshot under CACHE_DIR), a path, or None for
+    an in-memory snapshot.
+
+    backend: how files are enumerated ('walk', 'git', 'git+untracked'; default
+    config.FS_BACKEND), see FsIndex.
+    """
+
+    def __init__(self, root: Union[str, Path],
+                 ignore_dirs: Iterable[str] = IGNORE_DIRS,
+                 extensions: Iterable[str] = EXTENSIONS,
+                 cache_file: Optional[Union[str, Path]] = DEFAULT_CACHE_FILE,
+                 manifest_patterns: Iterable[str] = (),
+                 path_filter: Optional[PathFilter] = None,
+                 backend: Optional[str] = None):
+        self.root = str(root)
+        self.filter = path_filter or PathFilter(self.root, ignore_dirs, extensions)
+        self.manifest_patterns = tuple(sorted(manifest_patterns))
+        # One compiled alternation, matched once per file name of a re-listed directory
+        self._manifest_re = (re.compile('|'.join(fnmatch.translate(p) for p in self.manifest_patterns))
+                             if self.manifest_patterns else None)
+        self.index = FsIndex.shared(self.root, self.filter, cache_file, backend)
+        # rel dir -> (snapshot record it was derived from, matched files, manifest files)
+        self._views: Dict[str, Tuple[list, List[str], List[str]]] = {}
+        self._order: List[str] = []
+
+    @property
+    def rescanned(self) -> int:
+        """Directories re-listed during the last scan()."""
+        return self.index.rescanned
+
+    def _view(self, rel: str, record: list) -> Tuple[List[str], List[str]]:
+        view = self._views.get(rel)
+        if view is not None and view[0] is record:
+            return view[1], view[2]
+        match_extension = self.filter.match_extension
+        manifest_match = self._manifest_re.match if self._manifest_re else None
+        names = record[2]
+        files = [name for name in names if match_extension(name)]
+        manifests = ([name for name in names if manifest_match(name) is not None]
+                     if manifest_match is not None else [])
+        self._views[rel] = (record, files, manifests)
+        return files, manifests
+
+    def scan(self, persist: bool = True, dirty: Optional[Set[str]] = None,
+             restat: bool = False) -> List[TreeEntry]:
+        """
+        Walk the tree top-down (same pre-order as os.walk) and return entries.
+        Only directories whose mtime changed since the last snapshot are re-listed.
+
+        dirty:  relative paths ('' = root) reported changed by a filesystem watcher.
+                When given, only those are re-listed and all others are trusted as-is.
+        restat: refresh file stat signatures too (see stats()).
+        """
+        self.index.refresh(dirty=dirty, restat=restat, persist=persist)
+        root_name = os.path.basename(self.root) or self.root
+        entries: List[TreeEntry] = []
+        order: List[str] = []
+        views: Dict[str, Tuple[list, List[str], List[str]]] = {}
+        previous, self._views = self._views, views
+        for level, rel, record in self.index.walk():
+            cached = previous.get(rel)
+            if cached is not None:
+                views[rel] = cached
+            files, _ = self._view(rel, record)
+            order.append(rel)
+            entries.append((level, rel.rpartition('/')[2] if rel else root_name, files))
+        self._order = order
+        return entries
+
+    def files(self) -> List[str]:
+        """Relative paths ('/'-separated) of all matched files from the last scan()."""
+        paths = []
+        for rel in self._order:
+            prefix = f"{rel}/" if rel else ''
+            paths.extend(prefix + name for name in self._views[rel][1])
+        return paths
+
+    def manifests(self) -> List[str]:
+        """Relative paths of files matching manifest_patterns, shallowest first."""
+        paths = []
+        for rel in self._order:
+            prefix = f"{rel}/" if rel else ''
+            paths.extend(prefix + name for name in self._views[rel][2])
+        return sorted(paths, key=lambda p: (p.count('/'), p))
+
+    def stats(self) -> Dict[str, FileStat]:
+        """(size, mtime_ns, inode) per matched file; exact after a scan(restat=True)."""
+        result: Dict[str, FileStat] = {}
+        for rel in self._order:
+            prefix = f"{rel}/" if rel else ''
+            record, files, _ = self._views[rel]
+            signatures = record[2]
+            for name in files:
+                result[prefix + name] = tuple(signatures[name])
+        return result
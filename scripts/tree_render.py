@@ -0,0 +1,163 @@
+"""
+Compact Tree Renderer
+
+Renders (level, basename, matched_files) entries — the shape produced by
+TreeCache.scan() — into a token-lean tree:
+  * sibling runs sharing a prefix and extension collapse into a pattern
+    (`test_*.py ×240`)
+  * directories holding nothing but one subdirectory fold into a chain (`a/b/c/`)
+  * directories cut off by the depth limit keep a file count instead of vanishing
+  * output is built as a list of lines and joined once (linear time)
+
+fit_tree() searches for the most detailed rendering within a target size.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+INDENT = '  '
+COLLAPSE_MIN = 4  # Smallest sibling run rendered as a pattern
+
+# Run key: leading word plus its separator ("test_", "step-", "FW_") or the
+# alphabetic stem before a number ("chapter" in chapter12.md)
+_RUN_PREFIX = re.compile(r'^([A-Za-z]+[_\-.]|[A-Za-z]+(?=\d))')
+
+TreeEntry = Tuple[int, str, List[str]]
+
+
+class _Node:
+    __slots__ = ('name', 'files', 'children', 'total')
+
+    def __init__(self, name: str, files: List[str]):
+        self.name = name
+        self.files = files
+        self.children: List['_Node'] = []
+        self.total = len(files)
+
+
+def build_nodes(entries: Sequence[TreeEntry]) -> Optional[_Node]:
+    """Rebuild the directory hierarchy from pre-order (level, name, files) entries."""
+    root = None
+    stack: List[_Node] = []
+    for level, name, files in entries:
+        node = _Node(name, files)
+        del stack[level:]
+        if stack:
+            stack[-1].children.append(node)
+        else:
+            root = node
+        stack.append(node)
+    if root is not None:
+        _sum_totals(root)
+    return root
+
+
+def _sum_totals(root: _Node) -> None:
+    # Iterative post-order so deep trees don't hit the recursion limit
+    order, stack = [], [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node.children)
+    for node in reversed(order):
+        node.total = len(node.files) + sum(child.total for child in node.children)
+
+
+def _run_key(name: str) -> Optional[Tuple[str, str]]:
+    match = _RUN_PREFIX.match(name)
+    if not match:
+        return None
+    dot = name.rfind('.')
+    ext = name[dot:] if dot > 0 else ''
+    return match.group(1), ext
+
+
+def collapse_files(files: Sequence[str], collapse_min: int = COLLAPSE_MIN) -> List[str]:
+    """Replace runs of similarly named files with `prefix*ext ×N`; order is preserved."""
+    groups = {}
+    for name in files:
+        key = _run_key(name)
+        if key is not None:
+            groups.setdefault(key, []).append(name)
+
+    lines, emitted = [], set()
+    for name in files:
+        key = _run_key(name)
+        members = groups.get(key) if key is not None else None
+        if members is None or len(members) < collapse_min:
+            lines.append(name)
+        elif key not in emitted:
+            emitted.add(key)
+            prefix, ext = key
+            lines.append(f"{prefix}*{ext} ×{len(members)}")
+    return lines
+
+
+def render_nodes(root: _Node, depth_limit: Optional[int] = None,
+                 collapse_min: int = COLLAPSE_MIN, show_files: bool = True) -> List[str]:
+    """
+    Render the node tree to lines (no header).
+    show_files=False keeps only directories, each annotated with its subtree file count.
+    """
+    lines: List[str] = []
+    stack = [(root, 0)]
+    while stack:
+        node, level = stack.pop()
+        # Fold chains of directories that contain only a single subdirectory
+        label = node.name
+        while not node.files and len(node.children) == 1:
+            node = node.children[0]
+            label = f"{label}/{node.name}"
+
+        indent = INDENT * level
+        at_limit = depth_limit is not None and level >= depth_limit
+        if (at_limit or not show_files) and node.total:
+            lines.append(f"{indent}{label}/ ({node.total} files)")
+        else:
+            lines.append(f"{indent}{label}/")
+        if at_limit:
+            continue
+
+        if show_files:
+            subindent = INDENT * (level + 1)
+            lines.extend(subindent + line for line in collapse_files(node.files, collapse_min))
+        for child in reversed(node.children):
+            stack.append((child, level + 1))
+    return lines
+
+
+def render_compact(entries: Sequence[TreeEntry], depth_limit: Optional[int] = None,
+                   collapse_min: int = COLLAPSE_MIN, strategy: Optional[str] = None) -> str:
+    """Render entries with a header line, e.g. for make_prompt's <file_tree>."""
+    root = build_nodes(entries)
+    file_count = root.total if root else 0
+    if strategy is None:
+        strategy = "full tree" if depth_limit is None else f"{depth_limit}-level depth"
+    header = f"Project Structure (📊 {file_count} files, strategy: {strategy}, compact):"
+    body = render_nodes(root, depth_limit, collapse_min) if root else []
+    return '\n'.join([header] + body) + '\n'
+
+
+def fit_tree(entries: Sequence[TreeEntry], max_chars: int) -> str:
+    """
+    Most detailed rendering within max_chars. At each depth (full first, then
+    progressively shallower) try: files with normal collapsing, files with
+    aggressive collapsing, directories only with file counts.
+    """
+    root = build_nodes(entries)
+    if root is None:
+        return render_compact(entries)
+
+    max_level = max(level for level, _, _ in entries)
+    depths: List[Optional[int]] = [None] + list(range(max_level - 1, -1, -1))
+    for depth in depths:
+        for collapse_min, show_files in ((COLLAPSE_MIN, True), (2, True), (COLLAPSE_MIN, False)):
+            body = render_nodes(root, depth, collapse_min, show_files)
+            label = "full tree" if depth is None else f"{depth}-level depth"
+            if not show_files:
+                label += ", dirs only"
+            header = f"Project Structure (📊 {root.total} files, strategy: fit {max_chars} chars, {label}):"
+            text = '\n'.join([header] + body) + '\n'
+            if len(text) <= max_chars:
+                return text
+    return f"Project Structure (📊 {root.total} files, omitted to fit {max_chars} chars)\n"
@@ -8,7 +8,7 @@ Designed to run with zero third-party dependencies.
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, Union
 
 def get_project_root() -> Path:
     """
@@ -36,89 +36,60 @@ def get_project_root() -> Path:
     # scripts/utils.py -> scripts/ -> project_root
     return Path(__file__).resolve().parent.parent
 
-class SimpleYamlParser:
+def atomic_write_bytes(file_path: Union[str, Path], data: bytes) -> None:
     """
-    A minimal YAML parser for reading AGENTS_INDEX.yaml without PyYAML dependency.
-    Supports only the simple subset of YAML used by this project.
+    Write bytes via a temp file in the same directory followed by os.replace(),
+    so concurrent readers never observe a half-written file.
     """
-    
-    @staticmethod
-    def parse(file_path: Union[str, Path]) -> Dict[str, Any]:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            
-        result = {}
-        stack = [(result, -1)]  # (current_dict_or_list, indentation_level)
-        
-        # Simplified heuristic parse — only for reading core config.
-        # For production, use: pip install pyyaml
-        return SimpleYamlParser._heuristic_parse(lines)
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
 
-    @staticmethod
-    def _heuristic_parse(lines: List[str]) -> Dict[str, Any]:
-        """
-        Heuristic parser targeting the AGENTS_INDEX.yaml structure.
-        Extracts 'path' fields from the registry section.
-        """
-        data = {'registry': {}}
-        current_section = None
-        
-        for line in lines:
-            line = line.rstrip()
-            if not line or line.strip().startswith('#'):
-                continue
-                
-            indent = len(line) - len(line.lstrip())
-            content = line.strip()
-            
-            # Top level keys
-            if indent == 0 and content.endswith(':'):
-                key = content[:-1]
-                if key == 'registry':
-                    pass # We are in registry
-                else:
-                    current_section = None # Ignore other sections
-                    
-            # Registry sections (context, languages, etc.)
-            elif indent == 2 and content.endswith(':'):
-                current_section = content[:-1]
-                if current_section not in data['registry']:
-                     data['registry'][current_section] = []
-            
-            # List items or properties
-            elif indent >= 4:
-                if current_section:
-                    # Attempt to extract 'path' value
-                    if 'path:' in content:
-                        parts = content.split('path:')
-                        if len(parts) > 1:
-                            path_part = parts[1]
-                            
-                            # Strip trailing comments
-                            if '#' in path_part:
-                                path_part = path_part.split('#')[0]
-                            
-                            # Strip commas and braces (inline dicts)
-                            path_part = path_part.split(',')[0].strip().rstrip('}').strip()
-                            
-                            # Strip quotes
-                            path_part = path_part.strip('"\'')
-                            
-                            if path_part:
-                                data['registry'][current_section].append({'path': path_part})
-        
-        return data
+def atomic_write_text(file_path: Union[str, Path], content: str) -> None:
+    """UTF-8 text variant of atomic_write_bytes()."""
+    atomic_write_bytes(file_path, content.encode('utf-8'))
+
+def save_cache_quietly(file_path: Union[str, Path], data: Union[bytes, str]) -> bool:
+    """
+    Atomically write a cache file, ignoring OS errors: caches are an optimization
+    and a read-only checkout must still work. Returns whether the file was written.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    try:
+        atomic_write_bytes(file_path, data)
+    except OSError:
+        return False
+    return True
 
 def load_yaml_config(file_path: Union[str, Path]) -> Dict[str, Any]:
     """
-    Load a YAML file, preferring PyYAML and falling back to SimpleYamlParser.
+    Load a YAML file with PyYAML (libyaml's CSafeLoader when available),
+    falling back to the built-in subset parser (scripts/yaml_subset.py) only
+    when PyYAML is not installed.
     """
     try:
         import yaml
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
     except ImportError:
-        return SimpleYamlParser.parse(file_path)
+        yaml = None
+    try:
+        if yaml is not None:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+        try:
+            from scripts.yaml_subset import load as load_subset
+        except ImportError:
+            sys.path.append(str(Path(__file__).resolve().parent.parent))
+            from scripts.yaml_subset import load as load_subset
+        return load_subset(file_path)
     except Exception as e:
-        print(f"Warning: Error loading YAML {file_path}: {e}")
+        hint = " (install pyyaml for full YAML)" if yaml is None else ""
+        print(f"Warning: Error loading YAML {file_path}: {e}{hint}")
         return {}
@@ -0,0 +1,501 @@
+"""
+Zero-Dependency YAML Subset Parser
+
+Single pass over the lines of a document with an indentation stack; builds
+the same structure PyYAML's SafeLoader does for the subset this project
+writes (AGENTS_INDEX.yaml, bmad workflow.yaml files, skill configs):
+
+    block maps and block lists (including "- key: value" list items)
+    inline flow maps / lists   { name: "X", tags: ["a", "b"] }
+    single/double-quoted and plain scalars, YAML 1.1 scalar resolution
+    (null, bool, int incl. hex/octal/sexagesimal, float, date/timestamp)
+    literal | and folded > block scalars, full-line and trailing comments
+
+Anchors/aliases, tags, multi-document streams and flow collections spanning
+lines are rejected with YamlSubsetError instead of being misread.
+"""
+
+import datetime
+import re
+from pathlib import Path
+from typing import Any, List, Optional, Tuple, Union
+
+
+class YamlSubsetError(ValueError):
+    def __init__(self, message: str, line: Optional[int] = None):
+        super().__init__(f"line {line}: {message}" if line else message)
+        self.line = line
+
+
+# --- Scalars (YAML 1.1 resolution, as PyYAML's SafeLoader) ---
+
+_NULLS = {'', '~', 'null', 'Null', 'NULL'}
+_BOOLS = {
+    'yes': True, 'Yes': True, 'YES': True, 'true': True, 'True': True, 'TRUE': True,
+    'on': True, 'On': True, 'ON': True,
+    'no': False, 'No': False, 'NO': False, 'false': False, 'False': False, 'FALSE': False,
+    'off': False, 'Off': False, 'OFF': False,
+}
+_INT = re.compile(r'''[-+]?(?:0b[01_]+|0x[0-9a-fA-F_]+|0[0-7_]+|0|[1-9][0-9_]*)$''')
+_SEXAGESIMAL_INT = re.compile(r'[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+$')
+_FLOAT = re.compile(r'''[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?$
+                       |\.[0-9_]+(?:[eE][-+][0-9]+)?$
+                       |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*$
+                       |[-+]?\.(?:inf|Inf|INF)$
+                       |\.(?:nan|NaN|NAN)$''', re.X)
+_DATE = re.compile(r'([0-9]{4})-([0-9]{2})-([0-9]{2})$')
+_TIMESTAMP = re.compile(r'''([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})
+                            (?:[Tt]|[ \t]+)([0-9]{1,2}):([0-9]{2}):([0-9]{2})
+                            (?:\.([0-9]*))?
+                            (?:[ \t]*(Z|([-+])([0-9]{1,2})(?::([0-9]{2}))?))?$''', re.X)
+_FIRST_CHARS = set('-+0123456789.~nNtTfFyYoO')  # Plain scalars starting otherwise are strings
+
+
+def _sexagesimal(text: str) -> Union[int, float]:
+    sign = -1 if text[0] == '-' else 1
+    value = 0
+    for part in text.lstrip('-+').split(':'):
+        value = value * 60 + (float(part) if '.' in part else int(part))
+    return sign * value
+
+
+def _resolve_int(text: str) -> int:
+    text = text.replace('_', '')
+    sign = -1 if text[0] == '-' else 1
+    digits = text.lstrip('-+')
+    if digits.startswith('0b'):
+        return sign * int(digits[2:], 2)
+    if digits.startswith('0x'):
+        return sign * int(digits[2:], 16)
+    if len(digits) > 1 and digits[0] == '0':
+        return sign * int(digits, 8)
+    return sign * int(digits)
+
+
+def _resolve_float(text: str) -> float:
+    text = text.replace('_', '')
+    lowered = text.lower()
+    if lowered.endswith('.inf'):
+        return float('-inf') if text[0] == '-' else float('inf')
+    if lowered == '.nan':
+        return float('nan')
+    if ':' in text:
+        return float(_sexagesimal(text))
+    return float(text)
+
+
+def _resolve_timestamp(match) -> datetime.datetime:
+    year, month, day, hour, minute, second, fraction, tz, sign, tz_hour, tz_minute = match.groups()
+    micro = int((fraction or '0')[:6].ljust(6, '0'))
+    tzinfo = None
+    if tz:
+        delta = datetime.timedelta(hours=int(tz_hour or 0), minutes=int(tz_minute or 0))
+        tzinfo = datetime.timezone(-delta if sign == '-' else delta)
+    return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second),
+                             micro, tzinfo=tzinfo)
+
+
+def resolve_plain(text: str) -> Any:
+    """Type of an unquoted scalar, following PyYAML's implicit resolvers."""
+    if text in _NULLS:
+        return None
+    if text[0] not in _FIRST_CHARS:
+        return text
+    if text in _BOOLS:
+        return _BOOLS[text]
+    if _INT.match(text):
+        return _resolve_int(text)
+    if _SEXAGESIMAL_INT.match(text):
+        return _sexagesimal(text.replace('_', ''))
+    if _FLOAT.match(text):
+        return _resolve_float(text)
+    if text[0].isdigit():
+        match = _DATE.match(text)
+        if match:
+            return datetime.date(*map(int, match.groups()))
+        match = _TIMESTAMP.match(text)
+        if match:
+            return _resolve_timestamp(match)
+    return text
+
+
+_ESCAPES = {
+    '0': '\0', 'a': '\a', 'b': '\b', 't': '\t', '\t': '\t', 'n': '\n', 'v': '\v', 'f': '\f',
+    'r': '\r', 'e': '\x1b', ' ': ' ', '"': '"', '/': '/', '\\': '\\', 'N': '\x85',
+    '_': '\xa0', 'L': ' ', 'P': ' ',
+}
+_ESCAPE = re.compile(r'\\(x[0-9a-fA-F]{2}|u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)')
+
+
+def _unescape(match) -> str:
+    code = match.group(1)
+    if len(code) > 1:
+        return chr(int(code[1:], 16))
+    if code not in _ESCAPES:
+        raise YamlSubsetError(f"unknown escape sequence '\\{code}'")
+    return _ESCAPES[code]
+
+
+def _quoted_end(text: str, start: int) -> int:
+    """Index just past the quoted scalar opening at text[start]."""
+    quote = text[start]
+    i = start + 1
+    while True:
+        end = text.find(quote, i)
+        if end < 0:
+            raise YamlSubsetError("unterminated quoted scalar (multi-line quotes are not supported)")
+        if quote == '"':
+            backslashes = 0
+            while text[end - 1 - backslashes] == '\\':
+                backslashes += 1
+            if backslashes % 2:
+                i = end + 1
+                continue
+            return end + 1
+        if text.startswith("''", end):
+            i = end + 2  # '' is an escaped quote inside single quotes
+            continue
+        return end + 1
+
+
+def _quoted_value(token: str) -> str:
+    body = token[1:-1]
+    if token[0] == "'":
+        return body.replace("''", "'")
+    return _ESCAPE.sub(_unescape, body) if '\\' in body else body
+
+
+def _scalar(text: str) -> Any:
+    if text[0] in '"\'':
+        if _quoted_end(text, 0) != len(text):
+            raise YamlSubsetError(f"unexpected text after quoted scalar: {text!r}")
+        return _quoted_value(text)
+    if text[0] in '&*!|>%@`':
+        raise YamlSubsetError(f"unsupported YAML construct: {text!r}")
+    return resolve_plain(text)
+
+
+# --- Flow collections ---
+
+def _skip_spaces(text: str, i: int) -> int:
+    while i < len(text) and text[i] in ' \t':
+        i += 1
+    return i
+
+
+def _flow_plain_end(text: str, i: int, in_map: bool) -> int:
+    """End of a plain scalar inside a flow collection."""
+    n = len(text)
+    while i < n:
+        c = text[i]
+        if c in ',]}':
+            break
+        if c == ':' and (i + 1 == n or text[i + 1] in ' ,]}' or (in_map and text[i + 1] in '[{')):
+            break
+        i += 1
+    return i
+
+
+def _flow_node(text: str, i: int, in_map: bool = False) -> Tuple[Any, int]:
+    i = _skip_spaces(text, i)
+    if i >= len(text):
+        raise YamlSubsetError("unterminated flow collection (multi-line flow is not supported)")
+    c = text[i]
+    if c == '[':
+        return _flow_seq(text, i + 1)
+    if c == '{':
+        return _flow_map(text, i + 1)
+    if c in '"\'':
+        end = _quoted_end(text, i)
+        return _quoted_value(text[i:end]), end
+    end = _flow_plain_end(text, i, in_map)
+    token = text[i:end].rstrip()
+    return (_scalar(token) if token else None), end
+
+
+def _flow_seq(text: str, i: int) -> Tuple[list, int]:
+    items = []
+    while True:
+        i = _skip_spaces(text, i)
+        if i < len(text) and text[i] == ']':
+            return items, i + 1
+        item, i = _flow_node(text, i)
+        i = _skip_spaces(text, i)
+        if i < len(text) and text[i] == ':':
+            # Single-pair mapping inside a sequence: [a: 1]
+            value, i = _flow_node(text, i + 1)
+            item = {item: value}
+            i = _skip_spaces(text, i)
+        items.append(item)
+        if i < len(text) and text[i] == ',':
+            i += 1
+        elif i < len(text) and text[i] == ']':
+            return items, i + 1
+        else:
+            raise YamlSubsetError("expected ',' or ']' in flow sequence")
+
+
+def _flow_map(text: str, i: int) -> Tuple[dict, int]:
+    mapping = {}
+    while True:
+        i = _skip_spaces(text, i)
+        if i < len(text) and text[i] == '}':
+            return mapping, i + 1
+        key, i = _flow_node(text, i, in_map=True)
+        i = _skip_spaces(text, i)
+        value = None
+        if i < len(text) and text[i] == ':':
+            value, i = _flow_node(text, i + 1, in_map=True)
+            i = _skip_spaces(text, i)
+        mapping[key] = value
+        if i < len(text) and text[i] == ',':
+            i += 1
+        elif i < len(text) and text[i] == '}':
+            return mapping, i + 1
+        else:
+            raise YamlSubsetError("expected ',' or '}' in flow mapping")
+
+
+def _value(text: str) -> Any:
+    """Value of an inline node: flow collection or scalar."""
+    if text[0] in '[{':
+        node, end = (_flow_seq if text[0] == '[' else _flow_map)(text, 1)
+        if _skip_spaces(text, end) != len(text):
+            raise YamlSubsetError(f"unexpected text after flow collection: {text!r}")
+        return node
+    return _scalar(text)
+
+
+# --- Line level ---
+
+def _strip_comment(line: str) -> str:
+    """Drop a trailing comment ('#' at start or after whitespace, outside quotes)."""
+    if '#' not in line:
+        return line.rstrip()
+    i, n = 0, len(line)
+    prev = ' '
+    while i < n:
+        c = line[i]
+        if c == '#' and prev in ' \t':
+            return line[:i].rstrip()
+        if c in '"\'' and prev in ' \t:-[{,':
+            try:
+                i = _quoted_end(line, i)
+            except YamlSubsetError:
+                return line.rstrip()  # Reported properly when the value is parsed
+            prev = line[i - 1]
+            continue
+        prev = c
+        i += 1
+    return line.rstrip()
+
+
+def _split_key(content: str) -> Tuple[Optional[str], str]:
+    """'key: value' -> (key, value); (None, content) when the line is not a mapping entry."""
+    if content[0] in '"\'':
+        end = _quoted_end(content, 0)
+        rest = content[end:].lstrip()
+        if rest.startswith(':') and (len(rest) == 1 or rest[1] in ' \t'):
+            return content[:end], rest[1:].strip()
+        return None, content
+    if content[0] in '[{':
+        return None, content
+    i = content.find(':')
+    while i >= 0:
+        if i + 1 == len(content) or content[i + 1] in ' \t':
+            return content[:i].rstrip(), content[i + 1:].strip()
+        i = content.find(':', i + 1)
+    return None, content
+
+
+def _key(token: str) -> Any:
+    return _scalar(token) if token else None
+
+
+# Inside a plain value these would start a nested block, which YAML forbids on the key's line
+_PLAIN_MAPPING = re.compile(r':(?:[ \t]|$)')
+_BLOCK_HEADER = re.compile(r'([|>])([-+]?)([1-9]?)$|([|>])([1-9])([-+])$')
+
+
+class _BlockScalar:
+    """Pending literal/folded scalar: raw lines are collected until the indentation drops."""
+
+    def __init__(self, header: str, parent_indent: int, container, key):
+        match = _BLOCK_HEADER.match(header)
+        style, chomp, width = (match.group(1), match.group(2), match.group(3)) if match.group(1) \
+            else (match.group(4), match.group(6), match.group(5))
+        self.folded = style == '>'
+        self.chomp = chomp
+        self.indent = parent_indent + int(width) if width else None
+        self.parent_indent = parent_indent
+        self.container, self.key = container, key
+        self.lines: List[str] = []
+
+    def accepts(self, raw: str) -> bool:
+        stripped = raw.strip()
+        if not stripped:
+            return True
+        return len(raw) - len(raw.lstrip(' ')) > self.parent_indent
+
+    def finish(self) -> None:
+        lines = [line.rstrip('\r\n') for line in self.lines]
+        if self.indent is None:
+            widths = [len(l) - len(l.lstrip(' ')) for l in lines if l.strip()]
+            self.indent = min(widths) if widths else self.parent_indent + 1
+        body = [line[self.indent:] if line.strip() else '' for line in lines]
+        trailing = 0
+        while body and body[-1] == '':
+            body.pop()
+            trailing += 1
+        if self.folded:
+            # Breaks between two plain lines fold to a space (or to the blank lines between
+            # them); breaks next to more-indented lines are kept
+            parts, blanks, previous_more = [], 0, False
+            for line in body:
+                if not line:
+                    blanks += 1
+                    continue
+                more = line[0] in ' \t'
+                if parts or blanks:
+                    if not parts:
+                        parts.append('\n' * blanks)
+                    elif more or previous_more:
+                        parts.append('\n' * (blanks + 1))
+                    else:
+                        parts.append('\n' * blanks if blanks else ' ')
+                parts.append(line)
+                blanks, previous_more = 0, more
+            text = ''.join(parts)
+        else:
+            text = '\n'.join(body)
+        if body:
+            if self.chomp == '+':
+                text += '\n' * (trailing + 1)
+            elif self.chomp != '-':
+                text += '\n'
+        self.container[self.key] = text
+
+
+class _Frame:
+    __slots__ = ('indent', 'node')
+
+    def __init__(self, indent: int, node):
+        self.indent = indent
+        self.node = node
+
+
+def loads(text: str) -> Any:
+    """Parse one YAML document (subset) into Python objects."""
+    root: Any = None
+    stack: List[_Frame] = []
+    pending: Optional[Tuple[Any, Any, int]] = None  # (container, key, indent) awaiting a nested block
+    block: Optional[_BlockScalar] = None
+
+    def assign(container, key, value_text: str, indent: int) -> None:
+        nonlocal pending, block
+        if not value_text:
+            container[key] = None
+            pending = (container, key, indent)
+        elif value_text[0] in '|>' and _BLOCK_HEADER.match(value_text):
+            container[key] = ''
+            block = _BlockScalar(value_text, indent, container, key)
+        else:
+            if value_text[0] not in '"\'[{':
+                if value_text[0] == '-' and (len(value_text) == 1 or value_text[1] in ' \t'):
+                    raise YamlSubsetError("sequence entries are not allowed here")
+                if _PLAIN_MAPPING.search(value_text):
+                    raise YamlSubsetError("mapping values are not allowed here")
+            container[key] = _value(value_text)
+
+    def handle(indent: int, content: str) -> None:
+        nonlocal root, pending
+        if pending is not None:
+            container, key, key_indent = pending
+            pending = None
+            is_item = content[0] == '-' and (len(content) == 1 or content[1] in ' \t')
+            if indent > key_indent or (indent == key_indent and is_item and isinstance(container, dict)):
+                child = [] if is_item else {}
+                container[key] = child
+                stack.append(_Frame(indent, child))
+
+        while stack and (indent < stack[-1].indent or (
+                indent == stack[-1].indent and isinstance(stack[-1].node, list)
+                and not (content[0] == '-' and (len(content) == 1 or content[1] in ' \t')))):
+            stack.pop()
+
+        if not stack:
+            if root is not None:
+                raise YamlSubsetError("unexpected content after the document root")
+            is_item = content[0] == '-' and (len(content) == 1 or content[1] in ' \t')
+            key, _ = (None, None) if is_item else _split_key(content)
+            if not is_item and key is None:
+                root = _value(content)  # Document is a single scalar or flow node
+                return
+            root = [] if is_item else {}
+            stack.append(_Frame(indent, root))
+        top = stack[-1]
+        if indent != top.indent:
+            raise YamlSubsetError("bad indentation")
+
+        if isinstance(top.node, list):
+            if not (content[0] == '-' and (len(content) == 1 or content[1] in ' \t')):
+                raise YamlSubsetError("expected a '- ' list item")
+            item = content[1:].lstrip()
+            top.node.append(None)
+            index = len(top.node) - 1
+            if not item:
+                pending = (top.node, index, indent)
+                return
+            column = indent + len(content) - len(item)
+            is_item = item[0] == '-' and (len(item) == 1 or item[1] in ' \t')
+            key, _ = (None, None) if is_item else _split_key(item)
+            if is_item or key is not None:
+                # "- key: value" or "- - x": a nested block starting on the item line
+                child = [] if is_item else {}
+                top.node[index] = child
+                stack.append(_Frame(column, child))
+                handle(column, item)
+                return
+            assign(top.node, index, item, indent)
+            return
+
+        key, value_text = _split_key(content)
+        if key is None:
+            raise YamlSubsetError("expected 'key: value'")
+        assign(top.node, _key(key), value_text, indent)
+
+    for number, raw in enumerate(text.splitlines(), 1):
+        try:
+            if block is not None:
+                if block.accepts(raw):
+                    block.lines.append(raw)
+                    continue
+                block.finish()
+                block = None
+            content = _strip_comment(raw)
+            if not content.strip():
+                continue
+            stripped = content.lstrip(' ')
+            if stripped[0] == '\t':
+                raise YamlSubsetError("tabs are not allowed in indentation")
+            indent = len(content) - len(stripped)
+            if indent == 0 and stripped.startswith(('---', '...')) and stripped[3:4] in ('', ' '):
+                if root is None and stripped.startswith('---') and not stripped[3:].strip():
+                    continue  # Leading document marker
+                raise YamlSubsetError("multi-document streams are not supported")
+            if stripped[0] == '%':
+                raise YamlSubsetError("directives are not supported")
+            handle(indent, stripped)
+        except YamlSubsetError as e:
+            if e.line is None:
+                raise YamlSubsetError(str(e), number) from None
+            raise
+    if block is not None:
+        block.finish()
+    return root
+
+
+def load(file_path: Union[str, Path]) -> Any:
+    # utf-8-sig: a leading BOM is not part of the first key
+    with open(file_path, 'r', encoding='utf-8-sig') as f:
+        return loads(f.read())
@@ -8,12 +8,14 @@ from pathlib import Path
 
 # Add shared-utils to module path
 sys.path.insert(0, str(Path(__file__).parent / '.agents' / 'skills' / 'shared-utils'))
-from markdown_utils import generate_github_anchor
+from markdown_utils import scan_markdown
 
 def main():
     readme_path = Path(__file__).parent / 'README.md'
     content = readme_path.read_text(encoding='utf-8')
-    lines = content.split('\n')
+    # One fence-aware pass; every check below consumes this structure
+    doc = scan_markdown(content)
+    lines = doc.lines
     
     print('=' * 80)
     print('README.md Validation Report')
@@ -29,10 +31,8 @@ def main():
     # 2. Emoji check in headers
     print('2. Section Header Emoji Check')
     emoji_pattern = re.compile(r'[⭐🔧📁🧠🔴🟢🧪🤖📄🐙🧩📚🔒🎤🛡️📐🌍️]')
-    headers_with_emoji = []
-    for i, line in enumerate(lines, 1):
-        if re.match(r'^#{1,6}\s+', line) and emoji_pattern.search(line):
-            headers_with_emoji.append((i, line.strip()))
+    headers_with_emoji = [(h.line, lines[h.line - 1].strip()) for h in doc.headings
+                          if emoji_pattern.search(h.title)]
     
     if headers_with_emoji:
         print(f'   FAIL: {len(headers_with_emoji)} header(s) contain emoji:')
@@ -45,11 +45,18 @@ def main():
     # 3. Directory tree count (semantic detection via box-drawing characters)
     print('3. Directory Tree Check')
     # Detect trees by box-drawing characters (\u251c = ├, \u2514 = └) — decoupled from project name
-    tree_blocks = re.findall(r'```[^\n]*\n(?:.*\n)*?.*(?:\u251c\u2500\u2500|\u2514\u2500\u2500).*(?:\n.*)*?```', content)
-    if not tree_blocks:
-        # Fallback: consecutive lines (2+) containing tree characters
-        tree_blocks = re.findall(r'(?:^|\n)((?:[^\n]*(?:\u251c\u2500\u2500|\u2514\u2500\u2500)[^\n]*\n?){2,})', content)
-    tree_count = len(tree_blocks)
+    tree_marks = ('\u251c\u2500\u2500', '\u2514\u2500\u2500')
+    tree_count = sum(1 for block in doc.blocks
+                     if any(mark in line for line in block.body for mark in tree_marks))
+    if not tree_count:
+        # Fallback: runs of consecutive lines (2+) containing tree characters
+        run = 0
+        for line in lines + ['']:
+            if any(mark in line for mark in tree_marks):
+                run += 1
+                continue
+            tree_count += run >= 2
+            run = 0
     print(f'   Found {tree_count} directory tree block(s) (detected via \u251c\u2500\u2500/\u2514\u2500\u2500 characters)')
     if tree_count == 2:
         print('   OK: Correct (1 English + 1 Chinese)')
@@ -61,8 +68,8 @@ def main():
     
     # 4. File Categories section
     print('4. "File Categories" Section Check')
-    file_cat_en = len(re.findall(r'^### File Categories', content, re.MULTILINE))
-    file_cat_cn = len(re.findall(r'^### 文件分类', content, re.MULTILINE))
+    file_cat_en = sum(1 for h in doc.headings if h.level == 3 and h.title.startswith('File Categories'))
+    file_cat_cn = sum(1 for h in doc.headings if h.level == 3 and h.title.startswith('文件分类'))
     print(f'   English "File Categories": {file_cat_en}')
     print(f'   Chinese "文件分类": {file_cat_cn}')
     if file_cat_en == 1 and file_cat_cn == 1:
@@ -73,11 +80,9 @@ def main():
     
     # 5. Duplicate header check
     print('5. Duplicate Section Check')
-    headers = re.findall(r'^#{1,6}\s+(.+)$', content, re.MULTILINE)
     header_counts = {}
-    for h in headers:
-        clean_h = h.strip()
-        header_counts[clean_h] = header_counts.get(clean_h, 0) + 1
+    for h in doc.headings:
+        header_counts[h.title] = header_counts.get(h.title, 0) + 1
     
     duplicates = {h: c for h, c in header_counts.items() if c > 1}
     if duplicates:
@@ -90,23 +95,19 @@ def main():
     
     # 6. TOC link integrity
     print('6. TOC Link Integrity Check')
-    toc_section = re.search(r'## Table of Contents / 目录(.+?)(?=^##|\Z)', content, re.DOTALL | re.MULTILINE)
+    toc_section = doc.section('Table of Contents / 目录')
     if toc_section:
-        toc_links = re.findall(r'\[(.+?)\]\(#(.+?)\)', toc_section.group(1))
+        toc_links = doc.anchor_links(*toc_section)
         print(f'   TOC links found: {len(toc_links)}')
         
-        # Extract all actual headers and generate anchors
-        actual_anchors = set()
-        for match in re.finditer(r'^(#{1,6})\s+(.+)$', content, re.MULTILINE):
-            title = match.group(2).strip()
-            anchor = generate_github_anchor(title)
-            actual_anchors.add(anchor)
+        # Anchors of all actual headers were generated during the scan
+        actual_anchors = doc.anchors()
         
         # Check for broken links
         broken_links = []
-        for text, anchor in toc_links:
-            if anchor not in actual_anchors:
-                broken_links.append((text, anchor))
+        for link in toc_links:
+            if link.target[1:] not in actual_anchors:
+                broken_links.append((link.text, link.target[1:]))
         
         if broken_links:
             print(f'   WARN: {len(broken_links)} broken link(s):')
@@ -118,22 +119,14 @@ def main():
     
     # 7. Structural symmetry between EN and CN sections
     print('7. EN/CN Structural Symmetry')
-    cn_section_start = None
-    for m in re.finditer(r'^(#{1,2})\s+(.+)$', content, re.MULTILINE):
-        title = m.group(2)
-        cn_chars = len(re.findall(r'[\u4e00-\u9fff]', title))
-        if cn_chars >= 2 and m.group(1) == '#':
-            cn_section_start = m.start()
-            break
-    
-    if cn_section_start:
-        en_part = content[:cn_section_start]
-        cn_part = content[cn_section_start:]
-        en_h2 = len(re.findall(r'^## [^#]', en_part, re.MULTILINE))
-        cn_h2 = len(re.findall(r'^## [^#]', cn_part, re.MULTILINE))
-    else:
-        en_h2 = len(re.findall(r'^## [^#]', content[:len(content)//2], re.MULTILINE))
-        cn_h2 = len(re.findall(r'^## [^#]', content[len(content)//2:], re.MULTILINE))
+    cjk = re.compile(r'[\u4e00-\u9fff]')
+    # The Chinese half starts at the first H1 whose title has 2+ CJK characters
+    cn_section_start = next((h.line for h in doc.headings
+                             if h.level == 1 and len(cjk.findall(h.title)) >= 2), None)
+    if cn_section_start is None:
+        cn_section_start = len(lines) // 2 + 1
+    en_h2 = sum(1 for h in doc.headings if h.level == 2 and h.line < cn_section_start)
+    cn_h2 = sum(1 for h in doc.headings if h.level == 2 and h.line >= cn_section_start)
     print(f'   English main sections: {en_h2}')
     print(f'   Chinese main sections: {cn_h2}')
     if abs(en_h2 - cn_h2) <= 2:
@@ -2,9 +2,7 @@
 README.md Link Verification Script
 Verifies all TOC links correctly point to their corresponding section headers.
 """
-import re
 import sys
-import os
 from pathlib import Path
 
 # Ensure project modules are importable
@@ -12,38 +10,32 @@ project_root = Path(__file__).parent
 if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
-def extract_toc_links(content):
-    """Extract all links from the Table of Contents."""
-    # Match links of the form [text](#anchor)
-    pattern = r'\[([^\]]+)\]\(#([^\)]+)\)'
-    return re.findall(pattern, content)
-
-def extract_headers(content):
-    """Extract all section headers and their corresponding anchors."""
-    headers = {}
-    prefix_map = {}  # Auxiliary index for fast prefix-based fuzzy matching
-    lines = content.split('\n')
-    
-    # Load anchor generation utility from the hidden skill directory
+def _load_markdown_utils():
+    """Load the shared Markdown helpers from the hidden skill directory."""
     import importlib.util
     utils_path = project_root / '.agents' / 'skills' / 'shared-utils' / 'markdown_utils.py'
     spec = importlib.util.spec_from_file_location("markdown_utils", utils_path)
     markdown_utils = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(markdown_utils)
-    generate_github_anchor = markdown_utils.generate_github_anchor
-    
-    for line in lines:
-        match = re.match(r'^(#{1,6})\s+(.+)$', line.strip())
-        if match:
-            title = match.group(2).strip()
-            anchor = generate_github_anchor(title)
-            headers[anchor] = {'title': title, 'line': line}
-            
-            # Build prefix index (first 10 chars) for O(1) fuzzy lookup
-            prefix = anchor[:10]
-            if prefix not in prefix_map:
-                prefix_map[prefix] = []
-            prefix_map[prefix].append(anchor)
+    return markdown_utils
+
+def extract_toc_links(doc):
+    """Extract all [text](#anchor) links outside code blocks."""
+    return [(link.text, link.target[1:]) for link in doc.anchor_links()]
+
+def extract_headers(doc):
+    """Map the anchors generated during the scan to their section headers."""
+    headers = {}
+    prefix_map = {}  # Auxiliary index for fast prefix-based fuzzy matching
+    
+    for heading in doc.headings:
+        headers[heading.anchor] = {'title': heading.title, 'line': doc.lines[heading.line - 1]}
+        
+        # Build prefix index (first 10 chars) for O(1) fuzzy lookup
+        prefix = heading.anchor[:10]
+        if prefix not in prefix_map:
+            prefix_map[prefix] = []
+        prefix_map[prefix].append(heading.anchor)
     
     return headers, prefix_map
 
@@ -58,10 +50,12 @@ def verify_readme_links(readme_path, output_file=None):
     with open(readme_path, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    toc_links = extract_toc_links(content)
+    # One fence-aware pass yields both the links and the headers
+    doc = _load_markdown_utils().scan_markdown(content)
+    toc_links = extract_toc_links(doc)
     output(f"[TOC] Found {len(toc_links)} TOC link(s)")
     
-    headers, prefix_map = extract_headers(content)
+    headers, prefix_map = extract_headers(doc)
     output(f"[HEADERS] Found {len(headers)} section header(s)\n")
     
     invalid_links = []